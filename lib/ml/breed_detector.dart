@@ -83,7 +83,9 @@ class BreedDetector {
 
       // Load and preprocess image
       final image = img.decodeImage(await imageFile.readAsBytes())!;
-      final resized = img.copyResize(image, width: 224, height: 224);
+      final height = _inputShape[0];
+      final width = _inputShape[1];
+      final resized = img.copyResize(image, width: width, height: height);
 
       // Get shapes and create buffers
       final inputTensor = _interpreter.getInputTensor(0);
@@ -93,7 +95,7 @@ class BreedDetector {
       print('Output tensor shape: ${outputTensor.shape}');
 
       // Convert to float32 and normalize
-      final inputBuffer = Float32List(1 * 224 * 224 * 3);
+      final inputBuffer = Float32List(1 * height * width * 3);
       var pixel = 0;
 
       for (var y = 0; y < resized.height; y++) {
@@ -117,7 +119,7 @@ class BreedDetector {
       print('Running inference...');
       try {
         final inputs = {
-          0: inputBuffer.reshape([1, 224, 224, 3])
+          0: inputBuffer.reshape([1, height, width, 3])
         };
         final outputs = {0: outputBuffer};
 
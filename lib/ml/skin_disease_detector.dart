@@ -7,7 +7,8 @@ import 'package:image/image.dart' as img;
 class SkinDiseaseDetector {
   late Interpreter _interpreter;
   late Map<String, dynamic> _metadata;
-  static const int inputSize = 224;
+  // Overridden by input_shape in the metadata when the model was swept
+  int inputSize = 224;
   static const double _minimumConfidenceThreshold =
       0.15; // 15% minimum confidence
 
@@ -21,6 +22,9 @@ class SkinDiseaseDetector {
       final String metadataStr = await rootBundle
           .loadString('assets/models/skin_disease_metadata.json');
       _metadata = json.decode(metadataStr);
+      if (_metadata['input_shape'] != null) {
+        inputSize = (_metadata['input_shape'] as List)[0] as int;
+      }
     } catch (e) {
       throw Exception('Failed to load skin disease model: $e');
     }
@@ -0,0 +1,211 @@
+import tensorflow as tf
+import numpy as np
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from profiling import peak_rss_mb
+from tflite_utils import time_invokes
+
+# Get absolute paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "assets", "models")
+
+# Models bundled with the app (see pubspec.yaml)
+ASSET_MODELS = [
+    "symptom_model.tflite",
+    "symptoms_dog_model.tflite",
+    "symptoms_cat_model.tflite",
+    "breed_model.tflite",
+    "skin_disease_model.tflite",
+]
+
+# ModelManager creates every interpreter with InterpreterOptions()..threads = 4
+DEFAULT_THREADS = [1, 2, 4]
+DEFAULT_BATCH_SIZES = [1, 4, 16]
+# Slowdowns below this are timer noise for the microsecond-scale symptom models
+MIN_REGRESSION_MS = 0.05
+
+
+def benchmark_model(model_path, threads, batch_sizes, runs, warmup):
+    """Benchmark one model; runs in its own process so peak RSS is its own"""
+    rss_before_load = peak_rss_mb()
+
+    start = time.perf_counter()
+    interpreter = tf.lite.Interpreter(model_path=model_path)
+    interpreter.allocate_tensors()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    input_detail = interpreter.get_input_details()[0]
+    result = {
+        "size_bytes": os.path.getsize(model_path),
+        "load_ms": load_ms,
+        "input_shape": input_detail["shape"].tolist(),
+        "input_type": np.dtype(input_detail["dtype"]).name,
+        "runs": [],
+    }
+    del interpreter
+
+    rng = np.random.default_rng(0)
+    for num_threads in threads:
+        for batch_size in batch_sizes:
+            interpreter = tf.lite.Interpreter(
+                model_path=model_path, num_threads=num_threads
+            )
+            input_detail = interpreter.get_input_details()[0]
+            shape = [batch_size, *input_detail["shape"][1:]]
+            try:
+                interpreter.resize_tensor_input(input_detail["index"], shape)
+                interpreter.allocate_tensors()
+            except (RuntimeError, ValueError) as e:
+                print(f"  {os.path.basename(model_path)}: batch {batch_size}: {e}")
+                continue
+
+            if np.issubdtype(input_detail["dtype"], np.integer):
+                sample = rng.integers(0, 256, shape).astype(input_detail["dtype"])
+            else:
+                sample = rng.random(shape).astype(input_detail["dtype"])
+            interpreter.set_tensor(input_detail["index"], sample)
+
+            timings = time_invokes(interpreter, runs, warmup=warmup) * 1000
+            p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+            result["runs"].append(
+                {
+                    "threads": num_threads,
+                    "batch_size": batch_size,
+                    "p50_ms": float(p50),
+                    "p95_ms": float(p95),
+                    "p99_ms": float(p99),
+                    "p50_ms_per_sample": float(p50) / batch_size,
+                }
+            )
+
+    result["rss_before_load_mb"] = rss_before_load
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_benchmarks(model_paths, threads, batch_sizes, runs=200, warmup=10):
+    """Benchmark each model in a fresh process and collect a JSON report"""
+    report = {
+        "machine": {
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "tensorflow": tf.__version__,
+        },
+        "runs_per_config": runs,
+        "models": {},
+    }
+
+    context = multiprocessing.get_context("spawn")
+    for model_path in model_paths:
+        name = os.path.basename(model_path)
+        if not os.path.exists(model_path):
+            print(f"Skipping {name}: not found at {model_path}")
+            continue
+
+        print(f"Benchmarking {name}...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            report["models"][name] = executor.submit(
+                benchmark_model, model_path, threads, batch_sizes, runs, warmup
+            ).result()
+
+    return report
+
+
+def find_regressions(report, baseline, max_regression):
+    """List p50 latencies that got slower than baseline by more than max_regression"""
+    regressions = []
+    for name, result in report["models"].items():
+        baseline_runs = {
+            (run["threads"], run["batch_size"]): run
+            for run in baseline.get("models", {}).get(name, {}).get("runs", [])
+        }
+        for run in result["runs"]:
+            old = baseline_runs.get((run["threads"], run["batch_size"]))
+            if (
+                old
+                and run["p50_ms"] > old["p50_ms"] * (1 + max_regression)
+                and run["p50_ms"] - old["p50_ms"] > MIN_REGRESSION_MS
+            ):
+                regressions.append(
+                    f"{name} threads={run['threads']} batch={run['batch_size']}: "
+                    f"p50 {old['p50_ms']:.3f} -> {run['p50_ms']:.3f} ms"
+                )
+    return regressions
+
+
+def print_summary(report):
+    """Print a table of the report"""
+    print(
+        f"\n{'model':<28}{'threads':>8}{'batch':>7}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    for name, result in report["models"].items():
+        for run in result["runs"]:
+            print(
+                f"{name:<28}{run['threads']:>8}{run['batch_size']:>7}"
+                f"{run['p50_ms']:>10.3f}{run['p95_ms']:>10.3f}{run['p99_ms']:>10.3f}"
+            )
+        print(
+            f"{'':<28}load {result['load_ms']:.1f} ms, "
+            f"size {result['size_bytes'] / 1024:.1f} KB, "
+            f"peak RSS {result['peak_rss_mb'] or 0:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the exported TFLite models in assets/models"
+    )
+    parser.add_argument(
+        "models",
+        nargs="*",
+        help="Model files to benchmark (default: every model the app bundles)",
+    )
+    parser.add_argument("--threads", type=int, nargs="+", default=DEFAULT_THREADS)
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES
+    )
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument(
+        "--baseline", help="Fail if p50 latency regressed against this report"
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.1,
+        help="Allowed relative p50 slowdown against --baseline (default 10%%)",
+    )
+    args = parser.parse_args()
+
+    model_paths = args.models or [os.path.join(MODEL_DIR, m) for m in ASSET_MODELS]
+    report = run_benchmarks(
+        model_paths, args.threads, args.batch_sizes, args.runs, args.warmup
+    )
+    print_summary(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.max_regression)
+        if regressions:
+            print("\nLatency regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo latency regressions against baseline")
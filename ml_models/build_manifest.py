@@ -0,0 +1,98 @@
+import ast
+import hashlib
+import json
+import os
+
+MANIFEST_FILENAME = "build_manifest.json"
+
+
+def hash_file(path, digest=None):
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest
+
+
+def source_files(script_path):
+    """script_path and every module next to it that it imports, recursively.
+
+    Imports are read from the source, including ones inside functions, so
+    a helper module changing invalidates the builds of every trainer that
+    uses it. Returned sorted, so the hash does not depend on import order.
+    """
+    script_dir = os.path.dirname(os.path.abspath(script_path))
+    found = set()
+    pending = [os.path.abspath(script_path)]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.add(path)
+        with open(path, "r") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module_path = os.path.join(script_dir, name.split(".")[0] + ".py")
+                if os.path.exists(module_path):
+                    pending.append(module_path)
+    return sorted(found)
+
+
+def hash_inputs(inputs, files=()):
+    """Hash everything a model build depends on.
+
+    inputs is any JSON-serializable description (hyperparameters, seed,
+    class tables, dataset listing); files are hashed by name and content,
+    so moving the checkout does not invalidate the manifest.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(inputs, sort_keys=True, default=str).encode())
+    for path in files:
+        digest.update(os.path.basename(path).encode())
+        hash_file(path, digest)
+    return digest.hexdigest()
+
+
+def load_manifest(model_dir):
+    """Load the build manifest of a model directory, empty if there is none"""
+    manifest_path = os.path.join(model_dir, MANIFEST_FILENAME)
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def is_up_to_date(model_dir, name, inputs_hash):
+    """Whether name was built from the same inputs and its outputs are intact"""
+    entry = load_manifest(model_dir).get(name)
+    if not entry or entry["inputs_hash"] != inputs_hash:
+        return False
+
+    for filename, output_hash in entry["outputs"].items():
+        path = os.path.join(model_dir, filename)
+        if not os.path.exists(path) or hash_file(path).hexdigest() != output_hash:
+            return False
+    return True
+
+
+def record_build(model_dir, name, inputs_hash, outputs):
+    """Store the inputs hash and output file hashes of a finished build"""
+    manifest = load_manifest(model_dir)
+    manifest[name] = {
+        "inputs_hash": inputs_hash,
+        "outputs": {
+            filename: hash_file(os.path.join(model_dir, filename)).hexdigest()
+            for filename in outputs
+            if os.path.exists(os.path.join(model_dir, filename))
+        },
+    }
+    with open(os.path.join(model_dir, MANIFEST_FILENAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
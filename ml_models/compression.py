@@ -0,0 +1,289 @@
+import tensorflow as tf
+import numpy as np
+import contextlib
+import os
+import zlib
+from distillation import evaluate_accuracy
+from tflite_utils import measure_load_ms
+
+# Layers whose kernels are pruned and clustered; biases and batch norm stay
+PRUNABLE_LAYERS = (
+    tf.keras.layers.Dense,
+    tf.keras.layers.Conv2D,
+    tf.keras.layers.DepthwiseConv2D,
+)
+# Steps between mask updates while sparsity ramps up
+PRUNING_FREQUENCY = 10
+# Lloyd iterations of the per-kernel 1-D k-means
+CLUSTERING_ITERATIONS = 20
+
+
+def polynomial_sparsity(step, end_step, final_sparsity, initial_sparsity=0.0, power=3):
+    """Target sparsity at step of a polynomial decay schedule ending at end_step"""
+    progress = min(step / end_step, 1.0)
+    return (
+        final_sparsity + (initial_sparsity - final_sparsity) * (1 - progress) ** power
+    )
+
+
+def prunable_kernels(model):
+    """Kernel variables of every prunable layer, nested models included"""
+    kernels = []
+    for layer in model.layers:
+        if hasattr(layer, "layers"):
+            kernels.extend(prunable_kernels(layer))
+        elif isinstance(layer, PRUNABLE_LAYERS):
+            kernels.append(layer.kernel)
+    return kernels
+
+
+def kernel_sparsity(model):
+    """Fraction of zeros across all prunable kernels"""
+    kernels = [kernel.numpy() for kernel in prunable_kernels(model)]
+    zeros = sum(int(np.count_nonzero(kernel == 0)) for kernel in kernels)
+    return zeros / sum(kernel.size for kernel in kernels)
+
+
+def magnitude_mask(weights, sparsity):
+    """Mask zeroing the sparsity fraction of weights with the smallest magnitude"""
+    mask = np.ones(weights.size, dtype=weights.dtype)
+    num_pruned = int(weights.size * sparsity)
+    if num_pruned:
+        mask[np.argpartition(np.abs(weights).ravel(), num_pruned - 1)[:num_pruned]] = 0
+    return mask.reshape(weights.shape)
+
+
+class MagnitudePruning(tf.keras.callbacks.Callback):
+    """Prune the smallest kernel weights of target on a polynomial schedule.
+
+    Sparsity rises from 0 to final_sparsity over pruning_epochs, like
+    tfmot's PolynomialDecay schedule. Masks are recomputed per layer every
+    PRUNING_FREQUENCY steps and reapplied after every step, so pruned
+    weights stay at zero. When the steps per epoch are unknown (generator
+    datasets), the first epoch is counted and the ramp starts after it.
+    The final sparsity is enforced when training ends, whatever weights
+    EarlyStopping restored.
+    """
+
+    def __init__(self, target, final_sparsity, pruning_epochs=2):
+        super().__init__()
+        self.target = target
+        self.final_sparsity = final_sparsity
+        self.pruning_epochs = pruning_epochs
+
+    def on_train_begin(self, logs=None):
+        self.kernels = prunable_kernels(self.target)
+        self.masks = None
+        self.step = 0
+        self.begin_step = 0
+        self.end_step = None
+        if self.params.get("steps"):
+            self.end_step = self.params["steps"] * self.pruning_epochs
+
+    def on_epoch_end(self, epoch, logs=None):
+        if self.end_step is None:
+            self.begin_step = self.step
+            self.end_step = self.step * (self.pruning_epochs + 1)
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.step += 1
+        if self.end_step is None or self.step <= self.begin_step:
+            return
+        if (
+            self.step - self.begin_step
+        ) % PRUNING_FREQUENCY == 0 or self.step == self.end_step:
+            self.update_masks(
+                polynomial_sparsity(
+                    self.step - self.begin_step,
+                    self.end_step - self.begin_step,
+                    self.final_sparsity,
+                )
+            )
+        self.apply_masks()
+
+    def on_train_end(self, logs=None):
+        self.update_masks(self.final_sparsity)
+        self.apply_masks()
+
+    def update_masks(self, sparsity):
+        self.masks = [
+            magnitude_mask(kernel.numpy(), sparsity) for kernel in self.kernels
+        ]
+
+    def apply_masks(self):
+        if self.masks is None:
+            return
+        for kernel, mask in zip(self.kernels, self.masks):
+            kernel.assign(kernel.numpy() * mask)
+
+
+def cluster_values(values, num_clusters):
+    """1-D k-means of values with linearly spaced initial centroids.
+
+    Returns the values replaced by their centroid.
+    """
+    centroids = np.linspace(values.min(), values.max(), num_clusters)
+    for _ in range(CLUSTERING_ITERATIONS):
+        assignments = np.searchsorted((centroids[1:] + centroids[:-1]) / 2, values)
+        sums = np.bincount(assignments, weights=values, minlength=num_clusters)
+        counts = np.bincount(assignments, minlength=num_clusters)
+        updated = np.where(counts > 0, sums / np.maximum(counts, 1), centroids)
+        if np.allclose(updated, centroids):
+            break
+        centroids = np.sort(updated)
+    assignments = np.searchsorted((centroids[1:] + centroids[:-1]) / 2, values)
+    return centroids[assignments].astype(values.dtype)
+
+
+def cluster_kernels(model, num_clusters):
+    """Share num_clusters values per kernel; pruned zeros stay zero"""
+    for kernel in prunable_kernels(model):
+        weights = kernel.numpy()
+        nonzero = weights != 0
+        if np.count_nonzero(nonzero) > num_clusters:
+            weights[nonzero] = cluster_values(weights[nonzero], num_clusters)
+            kernel.assign(weights)
+
+
+def compressed_size(tflite_model):
+    """Deflated size, roughly what the model adds to the APK"""
+    return len(zlib.compress(tflite_model, 9))
+
+
+def compile_for_fine_tuning(model, learning_rate):
+    """Wrap model for fine-tuning with every layer but batch norm trainable.
+
+    Batches are resized to the model input, so models swept or distilled
+    to a smaller input still fine-tune on the trainer's input pipeline.
+    """
+    model.trainable = True
+    for layer in model.layers:
+        for inner in getattr(layer, "layers", [layer]):
+            if isinstance(inner, tf.keras.layers.BatchNormalization):
+                inner.trainable = False
+
+    trainer = tf.keras.Sequential(
+        [tf.keras.layers.Resizing(*model.input_shape[1:3]), model]
+    )
+    trainer.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    return trainer
+
+
+def copy_model(model):
+    """A new model with the same architecture and weights"""
+    copy = tf.keras.models.clone_model(model)
+    copy.set_weights(model.get_weights())
+    return copy
+
+
+def prune_model(
+    model, fit_data, sparsity, epochs=3, learning_rate=0.00001, callbacks=()
+):
+    """Fine-tune a copy of model while pruning it to sparsity.
+
+    Returns (pruned copy, validation accuracy). The ramp takes all but the
+    last epoch, which recovers accuracy at the final sparsity.
+    """
+    pruned = copy_model(model)
+    trainer = compile_for_fine_tuning(pruned, learning_rate)
+    trainer.fit(
+        **fit_data,
+        epochs=epochs,
+        callbacks=[
+            MagnitudePruning(pruned, sparsity, pruning_epochs=max(epochs - 1, 1)),
+            *callbacks,
+        ],
+    )
+    return pruned, evaluate_accuracy(trainer, fit_data["validation_data"])
+
+
+def compression_row(model_file, tflite_model, accuracy, baseline=None):
+    """Size, deflated size, load time and accuracy of one exported model"""
+    row = {
+        "model": model_file,
+        "accuracy": accuracy,
+        "size_bytes": len(tflite_model),
+        "compressed_bytes": compressed_size(tflite_model),
+        "load_ms": measure_load_ms(tflite_model),
+    }
+    if baseline:
+        row["accuracy_delta"] = accuracy - baseline["accuracy"]
+    return row
+
+
+def compress_model(
+    model,
+    tflite_model,
+    fit_data,
+    convert,
+    model_dir,
+    model_name,
+    sparsity_levels,
+    num_clusters=None,
+    epochs=3,
+    callbacks=lambda phase: [],
+    span=lambda name: contextlib.nullcontext(),
+):
+    """Export pruned (and optionally clustered) variants of a trained model.
+
+    For each sparsity level a copy of model is fine-tuned while pruned,
+    clustered to num_clusters shared values per kernel if set, converted
+    with convert and written as <model_name>_pruned<NN>[_c<K>].tflite.
+    Zeros and shared values are stored densely, so the gain shows up once
+    the file is deflated, as in the APK. Returns the metadata entry with
+    the dense baseline and every variant, and the files written.
+    """
+    baseline_trainer = compile_for_fine_tuning(copy_model(model), 0.00001)
+    baseline = compression_row(
+        f"{model_name}.tflite",
+        tflite_model,
+        evaluate_accuracy(baseline_trainer, fit_data["validation_data"]),
+    )
+    baseline["sparsity"] = 0.0
+
+    rows = []
+    outputs = []
+    for sparsity in sparsity_levels:
+        name = f"{model_name}_pruned{round(sparsity * 100):02d}"
+        print(f"Pruning {model_name} to {sparsity:.0%} sparsity...")
+        with span(f"prune_{sparsity}"):
+            pruned, accuracy = prune_model(
+                model, fit_data, sparsity, epochs, callbacks=callbacks(name)
+            )
+        if num_clusters:
+            name += f"_c{num_clusters}"
+            cluster_kernels(pruned, num_clusters)
+            trainer = compile_for_fine_tuning(pruned, 0.00001)
+            accuracy = evaluate_accuracy(trainer, fit_data["validation_data"])
+
+        variant = convert(pruned)
+        with open(os.path.join(model_dir, f"{name}.tflite"), "wb") as f:
+            f.write(variant)
+        outputs.append(f"{name}.tflite")
+        row = compression_row(f"{name}.tflite", variant, accuracy, baseline)
+        row["sparsity"] = kernel_sparsity(pruned)
+        row["clusters"] = num_clusters
+        rows.append(row)
+
+    print_compression([baseline, *rows])
+    return {"baseline": baseline, "variants": rows}, outputs
+
+
+def print_compression(rows):
+    """Table of sparsity, size, deflated size, load time and accuracy"""
+    print(
+        f"\n{'model':<40}{'sparsity':>9}{'size (KB)':>11}{'deflated (KB)':>15}"
+        f"{'load (ms)':>11}{'accuracy':>10}{'delta':>8}"
+    )
+    for row in rows:
+        print(
+            f"{row['model']:<40}{row['sparsity']:>9.2f}"
+            f"{row['size_bytes'] / 1024:>11.1f}"
+            f"{row['compressed_bytes'] / 1024:>15.1f}{row['load_ms']:>11.2f}"
+            f"{row['accuracy']:>10.3f}{row.get('accuracy_delta', 0.0):>+8.3f}"
+        )
+    print()
@@ -0,0 +1,136 @@
+import numpy as np
+import gzip
+import json
+import os
+from PIL import Image
+
+# Bumped when the index layout changes, so older indexes are rebuilt
+INDEX_VERSION = 1
+
+
+def image_dimensions(path):
+    """(width, height) read from the image header, (0, 0) if it cannot be read"""
+    try:
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return 0, 0
+
+
+def directory_mtimes(directories):
+    """mtime of each directory, None for ones that do not exist"""
+    return {
+        directory: os.stat(directory).st_mtime if os.path.isdir(directory) else None
+        for directory in directories
+    }
+
+
+def build_dataset_index(files, key, directories):
+    """Index (path, label) files by label, with size, mtime and image dimensions.
+
+    key describes what was scanned (source, class list); directories are the
+    folders whose mtimes tell whether files were added or removed since.
+    Columns are stored per label to keep the file small.
+    """
+    labels = {}
+    for path, label in files:
+        stat = os.stat(path)
+        width, height = image_dimensions(path)
+        columns = labels.setdefault(
+            label,
+            {"paths": [], "sizes": [], "mtimes": [], "widths": [], "heights": []},
+        )
+        columns["paths"].append(path)
+        columns["sizes"].append(stat.st_size)
+        columns["mtimes"].append(stat.st_mtime)
+        columns["widths"].append(width)
+        columns["heights"].append(height)
+
+    return {
+        "version": INDEX_VERSION,
+        "key": key,
+        "directories": directory_mtimes(directories),
+        "labels": labels,
+    }
+
+
+def save_dataset_index(index, path):
+    """Write the index as gzipped JSON, replacing any previous one atomically"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path + ".tmp", "wt") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(path + ".tmp", path)
+
+
+def load_dataset_index(path):
+    """Load a saved index, None if there is none"""
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt") as f:
+        return json.load(f)
+
+
+def index_is_current(index, key):
+    """Whether the index was built for key and no indexed directory has changed.
+
+    Only the directories are stat'ed here: adding or removing a file
+    updates its directory's mtime. Images edited in place are picked up by
+    refresh_file_stats.
+    """
+    if index.get("version") != INDEX_VERSION or index["key"] != key:
+        return False
+    return directory_mtimes(index["directories"]) == index["directories"]
+
+
+def refresh_file_stats(index):
+    """Re-stat every indexed file and update the changed ones in place.
+
+    A stat per file is far cheaper than the directory walk and header reads
+    of a rebuild; only files whose size or mtime moved have their image
+    dimensions read again. Returns the number of files updated.
+    """
+    changed = 0
+    for columns in index["labels"].values():
+        for i, path in enumerate(columns["paths"]):
+            stat = os.stat(path)
+            if (
+                stat.st_size == columns["sizes"][i]
+                and stat.st_mtime == columns["mtimes"][i]
+            ):
+                continue
+            columns["sizes"][i] = stat.st_size
+            columns["mtimes"][i] = stat.st_mtime
+            columns["widths"][i], columns["heights"][i] = image_dimensions(path)
+            changed += 1
+    return changed
+
+
+def index_files(index):
+    """(path, label, size, mtime) of every indexed file, grouped by label"""
+    return [
+        (path, label, size, mtime)
+        for label, columns in index["labels"].items()
+        for path, size, mtime in zip(
+            columns["paths"], columns["sizes"], columns["mtimes"]
+        )
+    ]
+
+
+def stratified_split(index, val_fraction, seed=0):
+    """Split the indexed files into (train, val) lists of (path, label).
+
+    Every label contributes the same fraction of its files to validation
+    (at least one when it has two or more). The split depends only on the
+    index and seed, so it is stable across runs.
+    """
+    rng = np.random.default_rng(seed)
+    train, val = [], []
+    for label in sorted(index["labels"]):
+        paths = index["labels"][label]["paths"]
+        order = rng.permutation(len(paths))
+        num_val = int(round(len(paths) * val_fraction))
+        if len(paths) > 1:
+            num_val = min(max(num_val, 1), len(paths) - 1)
+        val.extend((paths[i], label) for i in sorted(order[:num_val]))
+        train.extend((paths[i], label) for i in sorted(order[num_val:]))
+    return train, val
@@ -0,0 +1,143 @@
+import tensorflow as tf
+
+# Softmax temperature applied to teacher and student outputs
+DEFAULT_TEMPERATURE = 4.0
+# Weight of the hard-label loss; the rest goes to matching the teacher
+DEFAULT_HARD_LABEL_WEIGHT = 0.1
+# (MobileNetV2 alpha, input size) candidates; both have imagenet weights
+DEFAULT_STUDENTS = [(0.35, 128), (0.35, 160), (0.5, 160)]
+
+
+def student_name(model_name, alpha, image_size):
+    """File stem of a student, e.g. breed_model_student_a035_160"""
+    return f"{model_name}_student_a{round(alpha * 100):03d}_{image_size}"
+
+
+def create_student(num_classes, alpha, image_size, weights="imagenet"):
+    """MobileNetV2 at width alpha and a square input of image_size pixels"""
+    base_model = tf.keras.applications.MobileNetV2(
+        input_shape=(image_size, image_size, 3),
+        alpha=alpha,
+        include_top=False,
+        weights=weights,
+    )
+    return tf.keras.Sequential(
+        [
+            base_model,
+            tf.keras.layers.GlobalAveragePooling2D(),
+            tf.keras.layers.Dropout(0.2),
+            tf.keras.layers.Dense(num_classes, activation="softmax", dtype="float32"),
+        ]
+    )
+
+
+def log_probs(probs):
+    """Logits (up to a per-row constant) of a softmax output"""
+    return tf.math.log(tf.clip_by_value(tf.cast(probs, tf.float32), 1e-7, 1.0))
+
+
+class Distiller(tf.keras.Model):
+    """Train a student on the softened predictions of a frozen teacher.
+
+    Batches are fed at the teacher's resolution and resized for the
+    student, so the trainers' input pipelines are reused unchanged. The
+    loss mixes cross-entropy on the true labels (hard_label_weight) with
+    the KL divergence between teacher and student at temperature,
+    scaled by temperature**2 so its gradients keep their magnitude.
+    """
+
+    def __init__(self, teacher, student, temperature, hard_label_weight):
+        super().__init__()
+        self.teacher = teacher
+        self.student = student
+        self.teacher.trainable = False
+        self.temperature = temperature
+        self.hard_label_weight = hard_label_weight
+        self.student_size = tuple(student.input_shape[1:3])
+        self.kl_divergence = tf.keras.losses.KLDivergence()
+
+    def call(self, x, training=False):
+        return self.student(tf.image.resize(x, self.student_size), training=training)
+
+    def compute_loss(self, x=None, y=None, y_pred=None, sample_weight=None, **kwargs):
+        teacher_probs = self.teacher(x, training=False)
+        hard_loss = tf.keras.losses.sparse_categorical_crossentropy(y, y_pred)
+        soft_loss = self.kl_divergence(
+            tf.nn.softmax(log_probs(teacher_probs) / self.temperature),
+            tf.nn.softmax(log_probs(y_pred) / self.temperature),
+        )
+        return (
+            self.hard_label_weight * tf.reduce_mean(hard_loss)
+            + (1 - self.hard_label_weight) * self.temperature**2 * soft_loss
+        )
+
+
+def evaluate_accuracy(model, validation_data):
+    """Accuracy of a compiled model on a dataset or an (images, labels) tuple"""
+    if isinstance(validation_data, tuple):
+        results = model.evaluate(*validation_data, verbose=0, return_dict=True)
+    else:
+        results = model.evaluate(validation_data, verbose=0, return_dict=True)
+    return float(results["accuracy"])
+
+
+def distill(
+    teacher,
+    student,
+    fit_data,
+    epochs=20,
+    temperature=DEFAULT_TEMPERATURE,
+    hard_label_weight=DEFAULT_HARD_LABEL_WEIGHT,
+    callbacks=(),
+    learning_rate=0.0001,
+):
+    """Fit student to teacher on fit_data (model.fit keyword arguments).
+
+    Returns the student's validation accuracy; the student keeps the
+    weights of its best epoch.
+    """
+    distiller = Distiller(teacher, student, temperature, hard_label_weight)
+    distiller.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        metrics=["accuracy"],
+    )
+    distiller.fit(
+        **fit_data,
+        epochs=epochs,
+        callbacks=[
+            tf.keras.callbacks.EarlyStopping(
+                monitor="val_accuracy", patience=5, restore_best_weights=True
+            ),
+            *callbacks,
+        ],
+    )
+    return evaluate_accuracy(distiller, fit_data["validation_data"])
+
+
+def print_tradeoff(teacher, students):
+    """Table of accuracy, latency and size for the teacher and each student"""
+    print(
+        f"\n{'model':<38}{'input':>6}{'accuracy':>10}{'delta':>8}"
+        f"{'latency (ms)':>14}{'size (KB)':>11}"
+    )
+    for row in [teacher, *students]:
+        print(
+            f"{row['model']:<38}{row['input_size']:>6}{row['accuracy']:>10.3f}"
+            f"{row['accuracy'] - teacher['accuracy']:>+8.3f}"
+            f"{row['latency_ms']:>14.2f}{row['size_bytes'] / 1024:>11.1f}"
+        )
+    best = max(students, key=lambda row: (row["accuracy"], -row["latency_ms"]))
+    print(
+        f"Most accurate student: {best['model']}, "
+        f"{teacher['latency_ms'] / best['latency_ms']:.1f}x faster and "
+        f"{teacher['size_bytes'] / best['size_bytes']:.1f}x smaller than the teacher\n"
+    )
+
+
+def parse_students(values):
+    """Parse ALPHA:SIZE strings from the command line"""
+    students = []
+    for value in values:
+        alpha, size = value.split(":")
+        students.append((float(alpha), int(size)))
+    return students
@@ -0,0 +1,148 @@
+import os
+import re
+import shutil
+import tarfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests
+from build_manifest import hash_file
+
+# Read/write size for downloads and extraction
+CHUNK_SIZE = 1 << 20
+
+
+def content_range_total(response):
+    """Total resource size from a Content-Range header, None if absent"""
+    match = re.search(r"/(\d+)$", response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def verify_download(path, sha256=None):
+    """Whether a finished download matches sha256, or the digest recorded for it.
+
+    Files with neither (downloaded before digests were recorded) are trusted
+    and their digest is recorded now.
+    """
+    digest_path = path.with_name(path.name + ".sha256")
+    expected = sha256
+    if expected is None and digest_path.exists():
+        expected = digest_path.read_text().strip()
+    actual = hash_file(path).hexdigest()
+    if expected is None:
+        digest_path.write_text(actual)
+        return True
+    return actual == expected
+
+
+def download_file(url, path, sha256=None, timeout=60):
+    """Download url to path, resuming an interrupted download.
+
+    Bytes are streamed to <path>.part; when that exists, only the rest is
+    requested with an HTTP Range header. The finished file is checked
+    against sha256 when given, and its digest is kept in <path>.sha256 so
+    later runs detect a corrupted or truncated archive.
+    """
+    path = Path(path)
+    if path.exists():
+        if verify_download(path, sha256):
+            print(f"{path.name} already downloaded")
+            return path
+        print(f"{path.name} failed its checksum, downloading again")
+        path.unlink()
+
+    part_path = path.with_name(path.name + ".part")
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416:
+            # Nothing left to fetch, unless the partial file is not this resource
+            if content_range_total(response) != offset:
+                part_path.unlink()
+                return download_file(url, path, sha256, timeout)
+            total = offset
+        else:
+            response.raise_for_status()
+            if response.status_code == 206:
+                print(f"Resuming {path.name} at {offset / 2**20:.1f} MB...")
+                mode = "ab"
+                total = content_range_total(response)
+            else:
+                print(f"Downloading {path.name}...")
+                mode = "wb"
+                offset = 0
+                length = response.headers.get("Content-Length")
+                total = int(length) if length else None
+
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+
+    size = part_path.stat().st_size
+    if total is not None and size != total:
+        raise IOError(f"Incomplete download of {url}: {size} of {total} bytes")
+
+    actual = hash_file(part_path).hexdigest()
+    if sha256 is not None and actual != sha256:
+        part_path.unlink()
+        raise ValueError(f"Checksum mismatch for {url}: {actual} != {sha256}")
+    os.replace(part_path, path)
+    path.with_name(path.name + ".sha256").write_text(actual)
+    return path
+
+
+def extract_members(archive, dest_dir, select):
+    """Stream an archive, writing only the regular files select() keeps.
+
+    select maps a member name to its output path relative to dest_dir, or
+    None to skip it. Files already extracted with the member's size are
+    left alone. Returns (extracted, skipped) counts.
+    """
+    dest_dir = Path(dest_dir).resolve()
+    extracted = skipped = 0
+    # "r|*" reads the (possibly compressed) archive front to back without seeking
+    with tarfile.open(archive, "r|*") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            relative = select(member.name)
+            if relative is None:
+                continue
+            target = (dest_dir / relative).resolve()
+            if dest_dir not in target.parents:
+                raise ValueError(
+                    f"Refusing to extract {member.name} outside {dest_dir}"
+                )
+            if target.exists() and target.stat().st_size == member.size:
+                skipped += 1
+                continue
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            part_path = target.with_name(target.name + ".part")
+            with tar.extractfile(member) as src, open(part_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+            os.replace(part_path, target)
+            extracted += 1
+    return extracted, skipped
+
+
+def download_and_extract(archives, dest_dir, workers=None):
+    """Fetch and extract archives concurrently, one thread per archive.
+
+    archives is a list of (url, sha256 or None, select) tuples; see
+    download_file and extract_members. Returns {filename: (extracted, skipped)}.
+    """
+    dest_dir = Path(dest_dir)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+
+    def fetch(url, sha256, select):
+        filename = url.split("/")[-1]
+        archive = download_file(url, dest_dir / filename, sha256)
+        print(f"Extracting {filename}...")
+        extracted, skipped = extract_members(archive, dest_dir, select)
+        print(f"{filename}: {extracted} files extracted, {skipped} already present")
+        return filename, (extracted, skipped)
+
+    with ThreadPoolExecutor(max_workers=workers or len(archives)) as executor:
+        futures = [executor.submit(fetch, *archive) for archive in archives]
+        return dict(future.result() for future in futures)
@@ -0,0 +1,144 @@
+import tensorflow as tf
+import numpy as np
+import glob
+import hashlib
+import json
+import os
+from numpy.lib.format import open_memmap
+
+
+def image_hash(image):
+    """Content hash of one preprocessed image"""
+    image = np.ascontiguousarray(image)
+    digest = hashlib.sha1(image.tobytes())
+    digest.update(str((image.shape, image.dtype.str)).encode())
+    return digest.hexdigest()
+
+
+def create_feature_extractor(base_model):
+    """Frozen backbone followed by the same global average pooling as the models"""
+    return tf.keras.Sequential(
+        [base_model, tf.keras.layers.GlobalAveragePooling2D()],
+        name=f"{base_model.name}_features",
+    )
+
+
+def backbone_dir(cache_dir, backbone_key):
+    """Directory holding the shards of one backbone, so variants coexist"""
+    return os.path.join(cache_dir, backbone_key)
+
+
+def load_index(cache_dir, backbone_key):
+    """Load the cache index, starting over if it was built by another backbone"""
+    index_path = os.path.join(cache_dir, "index.json")
+    if os.path.exists(index_path):
+        with open(index_path, "r") as f:
+            index = json.load(f)
+        if index["backbone"] == backbone_key:
+            return index
+        print(f"Backbone changed, clearing feature cache in {cache_dir}")
+
+    for path in glob.glob(os.path.join(cache_dir, "features_*.npy")):
+        os.remove(path)
+    return {"backbone": backbone_key, "shards": [], "entries": {}}
+
+
+def cached_embeddings(extractor, batches, cache_dir, backbone_key):
+    """Pooled backbone embeddings for every image in batches.
+
+    batches yields (images, labels) NumPy batches. Embeddings are stored in
+    memory-mapped .npy shards keyed by image hash, so the backbone only runs
+    on images not seen by an earlier call. Each backbone_key gets its own
+    subdirectory of cache_dir, so switching backbones (e.g. between sweep
+    variants) keeps the other backbones' embeddings. Returns
+    (features, labels).
+    """
+    cache_dir = backbone_dir(cache_dir, backbone_key)
+    os.makedirs(cache_dir, exist_ok=True)
+    index = load_index(cache_dir, backbone_key)
+    entries = index["entries"]
+
+    hashes = []
+    labels = []
+    new_hashes = []
+    new_features = []
+    pending = set()
+    for images, batch_labels in batches:
+        images = np.asarray(images)
+        batch_hashes = [image_hash(image) for image in images]
+        missing = []
+        for i, h in enumerate(batch_hashes):
+            if h not in entries and h not in pending:
+                pending.add(h)
+                missing.append(i)
+        if missing:
+            new_features.append(extractor.predict_on_batch(images[missing]))
+            new_hashes.extend(batch_hashes[i] for i in missing)
+        hashes.extend(batch_hashes)
+        labels.extend(np.asarray(batch_labels).tolist())
+
+    print(
+        f"Feature cache: {len(hashes) - len(new_hashes)} cached, "
+        f"{len(new_hashes)} new embeddings"
+    )
+
+    if new_hashes:
+        new_features = np.concatenate(new_features).astype(np.float32)
+        shard_name = f"features_{len(index['shards']):05d}.npy"
+        shard = open_memmap(
+            os.path.join(cache_dir, shard_name),
+            mode="w+",
+            dtype=np.float32,
+            shape=new_features.shape,
+        )
+        shard[:] = new_features
+        shard.flush()
+        del shard
+
+        for row, h in enumerate(new_hashes):
+            entries[h] = [len(index["shards"]), row]
+        index["shards"].append(shard_name)
+        with open(os.path.join(cache_dir, "index.json"), "w") as f:
+            json.dump(index, f)
+
+    shards = [
+        np.load(os.path.join(cache_dir, name), mmap_mode="r")
+        for name in index["shards"]
+    ]
+    if not hashes:
+        return np.zeros((0, 0), np.float32), np.array(labels)
+
+    features = np.empty((len(hashes), shards[0].shape[1]), dtype=np.float32)
+    for i, h in enumerate(hashes):
+        shard_idx, row = entries[h]
+        features[i] = shards[shard_idx][row]
+    return features, np.array(labels)
+
+
+def array_batches(images, labels, batch_size=64):
+    """(images, labels) batches over in-memory arrays"""
+    for start in range(0, len(images), batch_size):
+        yield images[start : start + batch_size], labels[start : start + batch_size]
+
+
+def fit_head(model, train_features, train_labels, val_features, val_labels, **kwargs):
+    """Fit the layers after backbone + pooling of a Sequential model on embeddings.
+
+    The head shares its layers with model, so the trained weights end up in
+    the full model used for fine-tuning and export.
+    """
+    head = tf.keras.Sequential(
+        [tf.keras.Input(shape=train_features.shape[1:]), *model.layers[2:]]
+    )
+    head.compile(
+        optimizer=model.optimizer.__class__.from_config(model.optimizer.get_config()),
+        loss=model.loss,
+        metrics=["accuracy"],
+        jit_compile=model.jit_compile,
+    )
+    return head.fit(
+        train_features,
+        train_labels,
+        validation_data=(val_features, val_labels),
+        **kwargs,
+    )
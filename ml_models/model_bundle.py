@@ -0,0 +1,333 @@
+import numpy as np
+import argparse
+import json
+import os
+import struct
+import sys
+from functools import cached_property
+
+# Compact per-model bundle of labels, inputs, shapes and quantization parameters.
+# Little-endian; every section starts on a 4-byte boundary so its arrays can
+# be viewed in place:
+#   header  b"VCMB", u16 version, u16 section count
+#   table   per section: 4-byte tag, u32 offset, u32 length
+#   STRS    u32 count, u32 end offset of each string, UTF-8 bytes
+#   LABL    u32 string id of every output label, in output index order
+#   INPT    u32 string id of every input feature (symptom models)
+#   GRPS    u32 count, then per group: u32 name id, u32 size, u32 member ids
+#   SHAP    u32 rank, i32 input dims, u32 rank, i32 output dims
+#   QUNT    f32 scale, i32 zero point of the int8 model input, then output
+#   ATTR    u32 count, then (u32 key id, u32 value id) string pairs
+BUNDLE_MAGIC = b"VCMB"
+BUNDLE_VERSION = 1
+BUNDLE_EXTENSION = ".bundle"
+
+
+def pad4(data):
+    return data + b"\0" * (-len(data) % 4)
+
+
+def u32_array(values):
+    return np.asarray(values, dtype="<u4").tobytes()
+
+
+def write_bundle(
+    path,
+    labels,
+    inputs=(),
+    groups=None,
+    input_shape=None,
+    output_shape=None,
+    quantization=None,
+    attributes=None,
+):
+    """Write a model bundle and return its size in bytes.
+
+    labels are in output index order; groups maps a name (e.g. an animal
+    type) to member strings; quantization is the int8 entry returned by
+    tflite_utils.save_int8_model (only the input/output scale and zero point
+    are kept); attributes are plain string key/value pairs.
+    """
+    strings = {}
+
+    def string_id(value):
+        return strings.setdefault(str(value), len(strings))
+
+    sections = [
+        (b"LABL", u32_array([string_id(label) for label in labels])),
+        (b"INPT", u32_array([string_id(name) for name in inputs])),
+    ]
+    if groups:
+        data = struct.pack("<I", len(groups))
+        for name, members in groups.items():
+            data += struct.pack("<II", string_id(name), len(members))
+            data += u32_array([string_id(member) for member in members])
+        sections.append((b"GRPS", data))
+    if input_shape is not None and output_shape is not None:
+        data = b""
+        for shape in (input_shape, output_shape):
+            data += struct.pack("<I", len(shape))
+            data += np.asarray(shape, dtype="<i4").tobytes()
+        sections.append((b"SHAP", data))
+    if quantization:
+        sections.append(
+            (
+                b"QUNT",
+                struct.pack(
+                    "<fifi",
+                    quantization["input"]["scale"],
+                    quantization["input"]["zero_point"],
+                    quantization["output"]["scale"],
+                    quantization["output"]["zero_point"],
+                ),
+            )
+        )
+    if attributes:
+        data = struct.pack("<I", len(attributes))
+        for key, value in attributes.items():
+            data += struct.pack("<II", string_id(key), string_id(value))
+        sections.append((b"ATTR", data))
+
+    encoded = [value.encode("utf-8") for value in strings]
+    ends = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+    sections.insert(
+        0,
+        (
+            b"STRS",
+            struct.pack("<I", len(encoded)) + u32_array(ends) + b"".join(encoded),
+        ),
+    )
+
+    header = BUNDLE_MAGIC + struct.pack("<HH", BUNDLE_VERSION, len(sections))
+    offset = len(header) + 12 * len(sections)
+    table = b""
+    body = b""
+    for tag, data in sections:
+        table += tag + struct.pack("<II", offset + len(body), len(data))
+        body += pad4(data)
+
+    with open(path + ".tmp", "wb") as f:
+        f.write(header + table + body)
+    os.replace(path + ".tmp", path)
+    return len(header) + len(table) + len(body)
+
+
+class ModelBundle:
+    """Reader for a model bundle; sections are decoded on first access"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        if self.data[:4] != BUNDLE_MAGIC:
+            raise ValueError(f"{path} is not a model bundle")
+        self.version, count = struct.unpack_from("<HH", self.data, 4)
+        if self.version > BUNDLE_VERSION:
+            raise ValueError(f"Unsupported bundle version {self.version} in {path}")
+        self.sections = {}
+        for i in range(count):
+            tag, offset, length = struct.unpack_from("<4sII", self.data, 8 + 12 * i)
+            self.sections[tag.decode()] = (offset, length)
+
+    def u32s(self, offset, count):
+        return struct.unpack_from(f"<{count}I", self.data, offset)
+
+    @cached_property
+    def strings(self):
+        """The string table, decoded in one pass on first use"""
+        offset, _ = self.sections["STRS"]
+        (count,) = struct.unpack_from("<I", self.data, offset)
+        ends = self.u32s(offset + 4, count)
+        base = offset + 4 + 4 * count
+        starts = (0,) + ends[:-1]
+        return [
+            self.data[base + start : base + end].decode("utf-8")
+            for start, end in zip(starts, ends)
+        ]
+
+    def string_list(self, tag):
+        if tag not in self.sections:
+            return []
+        offset, length = self.sections[tag]
+        return [self.strings[i] for i in self.u32s(offset, length // 4)]
+
+    @cached_property
+    def labels(self):
+        return self.string_list("LABL")
+
+    @cached_property
+    def inputs(self):
+        return self.string_list("INPT")
+
+    @cached_property
+    def input_index(self):
+        """Input feature name -> position, built here instead of stored"""
+        return {name: i for i, name in enumerate(self.inputs)}
+
+    @cached_property
+    def groups(self):
+        if "GRPS" not in self.sections:
+            return {}
+        offset, _ = self.sections["GRPS"]
+        (count,) = struct.unpack_from("<I", self.data, offset)
+        offset += 4
+        groups = {}
+        for _ in range(count):
+            name_id, size = struct.unpack_from("<II", self.data, offset)
+            members = self.u32s(offset + 8, size)
+            groups[self.strings[name_id]] = [self.strings[i] for i in members]
+            offset += 8 + 4 * size
+        return groups
+
+    @cached_property
+    def shapes(self):
+        if "SHAP" not in self.sections:
+            return None, None
+        offset, _ = self.sections["SHAP"]
+        shapes = []
+        for _ in range(2):
+            (rank,) = struct.unpack_from("<I", self.data, offset)
+            shapes.append(list(struct.unpack_from(f"<{rank}i", self.data, offset + 4)))
+            offset += 4 + 4 * rank
+        return tuple(shapes)
+
+    @cached_property
+    def quantization(self):
+        if "QUNT" not in self.sections:
+            return None
+        offset, _ = self.sections["QUNT"]
+        in_scale, in_zero, out_scale, out_zero = struct.unpack_from(
+            "<fifi", self.data, offset
+        )
+        return {
+            "input": {"scale": in_scale, "zero_point": in_zero},
+            "output": {"scale": out_scale, "zero_point": out_zero},
+        }
+
+    @cached_property
+    def attributes(self):
+        if "ATTR" not in self.sections:
+            return {}
+        offset, _ = self.sections["ATTR"]
+        (count,) = struct.unpack_from("<I", self.data, offset)
+        ids = self.u32s(offset + 4, 2 * count)
+        return {
+            self.strings[key]: self.strings[value]
+            for key, value in zip(ids[::2], ids[1::2])
+        }
+
+    def to_dict(self):
+        input_shape, output_shape = self.shapes
+        return {
+            "labels": self.labels,
+            "inputs": self.inputs,
+            "groups": self.groups,
+            "input_shape": input_shape,
+            "output_shape": output_shape,
+            "quantization": self.quantization,
+            "attributes": self.attributes,
+        }
+
+
+def label_list(label_mapping):
+    """Labels of a {"index": label} mapping in index order"""
+    return [label_mapping[key] for key in sorted(label_mapping, key=int)]
+
+
+def bundles_from_assets(model_dir, output_dir=None):
+    """Write bundles for the JSON metadata already in model_dir.
+
+    Returns {bundle path: JSON files it replaces}.
+    """
+    output_dir = output_dir or model_dir
+    written = {}
+
+    def load(filename):
+        path = os.path.join(model_dir, filename)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    for model_name, mapping_file in [
+        ("symptom_model", "symptom_label_mapping.json"),
+        ("symptoms_dog_model", "symptoms_dog_label_mapping.json"),
+        ("symptoms_cat_model", "symptoms_cat_label_mapping.json"),
+    ]:
+        mapping = load(mapping_file)
+        if mapping is None:
+            continue
+        info = load(f"{model_name}_info.json") or {}
+        path = os.path.join(output_dir, model_name + BUNDLE_EXTENSION)
+        write_bundle(
+            path,
+            label_list(mapping["label_mapping"]),
+            inputs=mapping["symptoms"],
+            input_shape=info.get("input_shape"),
+            output_shape=info.get("output_shape"),
+            quantization=info.get("int8"),
+        )
+        written[path] = [mapping_file] + ([f"{model_name}_info.json"] if info else [])
+
+    breed = load("breed_metadata.json")
+    if breed is not None:
+        path = os.path.join(output_dir, "breed_model" + BUNDLE_EXTENSION)
+        write_bundle(
+            path,
+            label_list(breed["label_mapping"]),
+            groups=breed["breeds"],
+            input_shape=breed.get("input_shape"),
+            output_shape=[len(breed["label_mapping"])],
+            quantization=breed.get("int8"),
+            attributes=breed.get("preprocessing"),
+        )
+        written[path] = ["breed_metadata.json"]
+
+    skin = load("skin_disease_metadata.json")
+    if skin is not None:
+        # Older exports hold only the per-animal disease names
+        diseases = {
+            animal_type: [
+                disease["name"] if isinstance(disease, dict) else disease
+                for disease in animal_diseases
+            ]
+            for animal_type, animal_diseases in skin.get("diseases", skin).items()
+        }
+        label_mapping = skin.get("label_mapping") or {
+            str(i): label
+            for i, label in enumerate(
+                f"{animal_type}_{name}"
+                for animal_type, names in diseases.items()
+                for name in names
+            )
+        }
+        path = os.path.join(output_dir, "skin_disease_model" + BUNDLE_EXTENSION)
+        write_bundle(
+            path,
+            label_list(label_mapping),
+            groups=diseases,
+            quantization=skin.get("int8"),
+        )
+        written[path] = ["skin_disease_metadata.json"]
+
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact model metadata bundles")
+    parser.add_argument("--model-dir", default=os.path.join("..", "assets", "models"))
+    parser.add_argument(
+        "--from-assets",
+        action="store_true",
+        help="Write bundles for the JSON metadata already in --model-dir",
+    )
+    parser.add_argument("--dump", help="Print the contents of a bundle file")
+    args = parser.parse_args()
+
+    if args.from_assets:
+        for path in bundles_from_assets(args.model_dir):
+            print(f"Wrote {path} ({os.path.getsize(path)} bytes)")
+    if args.dump:
+        json.dump(ModelBundle(args.dump).to_dict(), sys.stdout, indent=2)
+        print()
+    if not (args.from_assets or args.dump):
+        parser.print_help()
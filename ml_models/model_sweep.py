@@ -0,0 +1,61 @@
+import itertools
+
+# Input sizes and MobileNetV2 widths swept; all have imagenet weights
+SWEEP_IMAGE_SIZES = [96, 128, 160, 224]
+SWEEP_ALPHAS = [0.35, 0.5, 0.75, 1.0]
+# Median single-image TFLite latency allowed on the training machine's CPU,
+# measured with 4 threads like ModelManager's interpreters
+DEFAULT_LATENCY_BUDGET_MS = 10.0
+
+
+def variant_name(model_name, alpha, image_size):
+    """Name of one swept variant, e.g. skin_disease_model_a050_160"""
+    return f"{model_name}_a{round(alpha * 100):03d}_{image_size}"
+
+
+def sweep_candidates(alphas=SWEEP_ALPHAS, image_sizes=SWEEP_IMAGE_SIZES):
+    """Every (alpha, image_size) pair, narrowest backbone first"""
+    return list(itertools.product(alphas, image_sizes))
+
+
+def budget_key(row, latency_budget_ms):
+    """Sort key preferring rows within the budget, then the most accurate.
+
+    Ties go to the faster model. When nothing fits, the fastest wins. The
+    key orders any two rows the same way however they are grouped, so the
+    best row can be tracked while a sweep is still running.
+    """
+    if row["latency_ms"] <= latency_budget_ms:
+        return (1, row["accuracy"], -row["latency_ms"])
+    return (0, -row["latency_ms"], 0)
+
+
+def print_sweep(rows, chosen, latency_budget_ms):
+    """Table of every variant, marking the chosen one"""
+    print(
+        f"\n{'model':<40}{'alpha':>6}{'input':>6}{'accuracy':>10}"
+        f"{'latency (ms)':>14}{'size (KB)':>11}"
+    )
+    for row in rows:
+        marker = " <-" if row is chosen else ""
+        alpha = f"{row['alpha']:.2f}" if row.get("alpha") else "-"
+        print(
+            f"{row['model']:<40}{alpha:>6}{row['input_size']:>6}"
+            f"{row['accuracy']:>10.3f}{row['latency_ms']:>14.2f}"
+            f"{row['size_bytes'] / 1024:>11.1f}{marker}"
+        )
+    if chosen["latency_ms"] > latency_budget_ms:
+        print(f"No variant fits the {latency_budget_ms} ms budget, using the fastest")
+    print(
+        f"Chose {chosen['model']} ({chosen['input_size']}px) under a "
+        f"{latency_budget_ms} ms budget\n"
+    )
+
+
+def sweep_metadata(rows, chosen, latency_budget_ms):
+    """Metadata entry recording the budget, the choice and every variant"""
+    return {
+        "latency_budget_ms": latency_budget_ms,
+        "chosen": chosen["model"],
+        "variants": rows,
+    }
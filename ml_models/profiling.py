@@ -0,0 +1,178 @@
+import tensorflow as tf
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from training_utils import StepTimer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Runs kept in each <model>_profile.json
+MAX_PROFILE_RUNS = 20
+
+
+def proc_status_mb(field):
+    """A memory field of /proc/self/status (e.g. VmHWM) in MB, None if absent"""
+    if not os.path.exists("/proc/self/status"):
+        return None
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, if the OS reports it"""
+    peak = proc_status_mb("VmHWM")
+    if peak is not None:
+        return peak
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def reset_peak_rss():
+    """Reset the peak RSS high-water mark, where the OS allows it (Linux).
+
+    Returns whether the peak now equals the current RSS; some kernels and
+    sandboxes accept the write without resetting anything.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        return False
+    peak, current = proc_status_mb("VmHWM"), proc_status_mb("VmRSS")
+    return peak is not None and current is not None and peak - current < 1
+
+
+class TraceWindow(tf.keras.callbacks.Callback):
+    """Capture a tf.profiler trace for train steps [start_step, stop_step)"""
+
+    def __init__(self, log_dir, start_step, stop_step):
+        super().__init__()
+        self.log_dir = log_dir
+        self.start_step = start_step
+        self.stop_step = stop_step
+        self.step = 0
+        self.tracing = False
+
+    def on_train_batch_begin(self, batch, logs=None):
+        if self.step == self.start_step:
+            tf.profiler.experimental.start(self.log_dir)
+            self.tracing = True
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.step += 1
+        if self.tracing and self.step >= self.stop_step:
+            tf.profiler.experimental.stop()
+            self.tracing = False
+            print(f"Profiler trace for steps {self.start_step}-{self.stop_step}")
+            print(f"  written to {self.log_dir}")
+
+    def on_train_end(self, logs=None):
+        if self.tracing:
+            tf.profiler.experimental.stop()
+            self.tracing = False
+
+
+class Profiler:
+    """Named timed spans, per-span peak RSS and per-epoch throughput of a run.
+
+    Spans are meant to be sequential phases (data, fit, convert, write);
+    on Linux the peak RSS high-water mark is reset at the start of each
+    span, so every span reports its own peak.
+    """
+
+    def __init__(self, name, trace_dir=None, trace_steps=None):
+        self.name = name
+        self.trace_dir = trace_dir
+        self.trace_steps = trace_steps
+        self.spans = []
+        self.timers = {}
+        self.started = datetime.now(timezone.utc).isoformat()
+        self.start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        reset = reset_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append(
+                {
+                    "name": name,
+                    "seconds": time.perf_counter() - start,
+                    "peak_rss_mb": peak_rss_mb(),
+                    "peak_is_per_span": reset,
+                }
+            )
+
+    def callbacks(self, phase, batch_size=None, label="", unit="images"):
+        """Keras callbacks recording samples/sec per epoch for one fit phase.
+
+        The first phase asking gets the tf.profiler trace window, if one was
+        requested.
+        """
+        timer = StepTimer(batch_size, label, unit)
+        self.timers[phase] = timer
+        callbacks = [timer]
+        if self.trace_steps:
+            start_step, stop_step = self.trace_steps
+            log_dir = self.trace_dir or os.path.join("profiles", self.name)
+            callbacks.append(
+                TraceWindow(os.path.join(log_dir, phase), start_step, stop_step)
+            )
+            self.trace_steps = None
+        return callbacks
+
+    def report(self):
+        return {
+            "model": self.name,
+            "started": self.started,
+            "total_seconds": time.perf_counter() - self.start,
+            "machine": {
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "tensorflow": tf.__version__,
+            },
+            "spans": self.spans,
+            "epochs": {
+                phase: {
+                    "step_time_ms": timer.epoch_step_times,
+                    "samples_per_sec": timer.epoch_samples_per_sec,
+                }
+                for phase, timer in self.timers.items()
+            },
+        }
+
+    def save(self, model_dir):
+        """Append this run to <name>_profile.json and print the span table"""
+        report = self.report()
+        path = os.path.join(model_dir, f"{self.name}_profile.json")
+        runs = []
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                runs = json.load(f).get("runs", [])
+        runs = (runs + [report])[-MAX_PROFILE_RUNS:]
+        with open(path, "w") as f:
+            json.dump({"runs": runs}, f, indent=2)
+
+        print(f"\n{'span':<20}{'seconds':>10}{'peak RSS (MB)':>15}")
+        for span in report["spans"]:
+            print(
+                f"{span['name']:<20}{span['seconds']:>10.2f}"
+                f"{span['peak_rss_mb'] or 0:>15.1f}"
+            )
+        print(f"Profile saved to {path}")
+        return report
@@ -0,0 +1,140 @@
+import numpy as np
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+import cv2
+
+# Get absolute paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "assets", "models")
+
+
+def make_payloads(endpoint, count, seed=0):
+    """Build request bodies for an endpoint from random symptoms or images"""
+    rng = np.random.default_rng(seed)
+
+    if endpoint == "symptom":
+        with open(os.path.join(MODEL_DIR, "symptom_label_mapping.json"), "r") as f:
+            symptoms = json.load(f)["symptoms"]
+        return [
+            json.dumps(
+                {
+                    "symptoms": list(
+                        rng.choice(symptoms, size=rng.integers(1, 6), replace=False)
+                    )
+                }
+            ).encode()
+            for _ in range(count)
+        ]
+
+    # A few distinct encoded images are enough to exercise decode + inference
+    images = []
+    for _ in range(min(count, 8)):
+        img = rng.integers(0, 256, (224, 224, 3), dtype=np.uint8)
+        _, encoded = cv2.imencode(".jpg", img)
+        images.append(base64.b64encode(encoded.tobytes()).decode())
+    return [
+        json.dumps({"image": images[i % len(images)]}).encode() for i in range(count)
+    ]
+
+
+async def client(host, port, endpoint, payloads, latencies, errors):
+    """Send payloads one after another over a single keep-alive connection"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in payloads:
+            start = time.perf_counter()
+            writer.write(
+                f"POST /{endpoint} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                key, _, value = line.decode("latin-1").partition(":")
+                if key.strip().lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, endpoint, concurrency, num_requests):
+    """Drive num_requests through concurrency connections and report stats"""
+    payloads = make_payloads(endpoint, num_requests)
+    latencies = []
+    errors = []
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[
+            client(host, port, endpoint, payloads[i::concurrency], latencies, errors)
+            for i in range(concurrency)
+        ]
+    )
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = (
+        np.percentile(latencies_ms, [50, 95, 99]) if len(latencies) else (0, 0, 0)
+    )
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": num_requests,
+        "errors": len(errors),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Load-test the scoring server and report throughput and tail latency"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--endpoint", choices=["symptom", "breed", "skin"], default="symptom"
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    print(
+        f"{'concurrency':>12}{'req/s':>10}{'p50 ms':>10}"
+        f"{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+    )
+    for concurrency in args.concurrency:
+        result = asyncio.run(
+            run_load(args.host, args.port, args.endpoint, concurrency, args.requests)
+        )
+        results.append(result)
+        print(
+            f"{concurrency:>12}{result['throughput_rps']:>10.0f}"
+            f"{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            f"{result['p99_ms']:>10.2f}{result['errors']:>8}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
@@ -0,0 +1,289 @@
+import tensorflow as tf
+import numpy as np
+import argparse
+import asyncio
+import base64
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from symptom_inference import SymptomInferenceEngine
+from tflite_utils import invoke_batch
+
+# Get absolute paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "assets", "models")
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Server Error"}
+
+
+class ImageClassifier:
+    """Breed / skin model scorer using the same preprocessing as the app"""
+
+    def __init__(self, model_path, metadata_path, num_threads=2):
+        with open(metadata_path, "r") as f:
+            label_mapping = json.load(f).get("label_mapping", {})
+        self.labels = [label_mapping[str(i)] for i in range(len(label_mapping))]
+
+        self.interpreter = tf.lite.Interpreter(
+            model_path=model_path, num_threads=num_threads
+        )
+        self.interpreter.allocate_tensors()
+        _, height, width, _ = self.interpreter.get_input_details()[0]["shape"]
+        self.input_size = (int(width), int(height))
+
+    def decode(self, image_bytes):
+        """Decode an encoded image to a resized RGB float32 array in [0, 1]"""
+        img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            raise ValueError("Could not decode image")
+        img = cv2.resize(img, self.input_size)
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # breed_detector.dart / skin_disease_detector.dart divide by 255
+        return img.astype(np.float32) / 255.0
+
+    def predict_proba(self, images):
+        return invoke_batch(self.interpreter, np.stack(images))
+
+
+class MicroBatcher:
+    """Collect concurrent requests for one model into micro-batches.
+
+    A batch is dispatched to the thread pool once max_batch_size requests
+    are queued or max_wait_ms has passed since the first one arrived. Only
+    one batch per model is in flight, so each interpreter is used by a
+    single thread at a time.
+    """
+
+    def __init__(self, predict_batch, executor, max_batch_size=32, max_wait_ms=5):
+        self.predict_batch = predict_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.batch_sizes = []
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batch_sizes.append(len(batch))
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.predict_batch, [item for item, _ in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+def rank(probs, labels, top_k):
+    """Top-k (label, probability) pairs of one probability row"""
+    order = np.argsort(-probs)[:top_k]
+    return [[labels[i] if i < len(labels) else str(i), float(probs[i])] for i in order]
+
+
+class ScoringServer:
+    """Local HTTP scoring service for the exported symptom, breed and skin models.
+
+    POST /symptom {"symptoms": [...], "top_k": 3}
+    POST /breed   {"image": "<base64 JPEG/PNG>", "top_k": 3}
+    POST /skin    {"image": "<base64 JPEG/PNG>", "top_k": 3}
+    GET  /health
+    """
+
+    def __init__(
+        self,
+        model_dir=MODEL_DIR,
+        max_batch_size=32,
+        max_wait_ms=5,
+        pool_threads=3,
+        interpreter_threads=2,
+    ):
+        self.executor = ThreadPoolExecutor(max_workers=pool_threads)
+        self.batchers = {}
+        self.decoders = {}
+        self.labels = {}
+
+        def add(name, predict_batch, labels, decode=None):
+            self.batchers[name] = MicroBatcher(
+                predict_batch, self.executor, max_batch_size, max_wait_ms
+            )
+            self.labels[name] = labels
+            self.decoders[name] = decode
+            print(f"✓ Loaded {name} model")
+
+        symptom_model = os.path.join(model_dir, "symptom_model.tflite")
+        if os.path.exists(symptom_model):
+            engine = SymptomInferenceEngine(
+                model_path=symptom_model,
+                label_mapping_path=os.path.join(
+                    model_dir, "symptom_label_mapping.json"
+                ),
+                num_threads=interpreter_threads,
+            )
+            add(
+                "symptom",
+                lambda sets: engine.predict_proba(engine.encode(sets)),
+                engine.labels,
+            )
+
+        for name, model_file, metadata_file in [
+            ("breed", "breed_model.tflite", "breed_metadata.json"),
+            ("skin", "skin_disease_model.tflite", "skin_disease_metadata.json"),
+        ]:
+            model_path = os.path.join(model_dir, model_file)
+            if not os.path.exists(model_path):
+                print(f"Skipping {name} endpoint: {model_path} not found")
+                continue
+            classifier = ImageClassifier(
+                model_path,
+                os.path.join(model_dir, metadata_file),
+                num_threads=interpreter_threads,
+            )
+            add(name, classifier.predict_proba, classifier.labels, classifier.decode)
+
+    async def score(self, name, request):
+        loop = asyncio.get_running_loop()
+        top_k = int(request.get("top_k", 3))
+
+        if name == "symptom":
+            item = request["symptoms"]
+            if not isinstance(item, list) or not all(
+                isinstance(symptom, str) for symptom in item
+            ):
+                raise TypeError("symptoms must be a list of strings")
+        else:
+            # Decode off the event loop; only valid images reach the batch
+            image_bytes = base64.b64decode(request["image"])
+            item = await loop.run_in_executor(
+                self.executor, self.decoders[name], image_bytes
+            )
+
+        probs = await self.batchers[name].submit(item)
+        return {"predictions": rank(probs, self.labels[name], top_k)}
+
+    async def dispatch(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {
+                "models": sorted(self.batchers),
+                "mean_batch_size": {
+                    name: float(np.mean(b.batch_sizes)) if b.batch_sizes else 0.0
+                    for name, b in self.batchers.items()
+                },
+            }
+
+        name = path.strip("/")
+        if method != "POST" or name not in self.batchers:
+            return 404, {"error": f"No endpoint {method} {path}"}
+
+        try:
+            request = json.loads(body)
+        except json.JSONDecodeError as e:
+            return 400, {"error": f"Invalid JSON: {e}"}
+
+        try:
+            return 200, await self.score(name, request)
+        except (KeyError, TypeError, ValueError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one keep-alive connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, payload = await self.dispatch(method, path, body)
+
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        workers = [asyncio.create_task(b.run()) for b in self.batchers.values()]
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Scoring server listening on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            self.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve the exported models over HTTP with micro-batching"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=5,
+        help="Longest a request waits for its micro-batch to fill",
+    )
+    parser.add_argument("--pool-threads", type=int, default=3)
+    parser.add_argument("--interpreter-threads", type=int, default=2)
+    args = parser.parse_args()
+
+    server = ScoringServer(
+        model_dir=args.model_dir,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        pool_threads=args.pool_threads,
+        interpreter_threads=args.interpreter_threads,
+    )
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nScoring server stopped")
@@ -0,0 +1,132 @@
+import tensorflow as tf
+import numpy as np
+import argparse
+import json
+import os
+import time
+from tflite_utils import invoke_batch
+
+# Get absolute paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "assets", "models")
+
+
+class SymptomInferenceEngine:
+    """Score batches of symptom sets with the exported symptom model.
+
+    The interpreter input is resized to the batch size, so a whole clinic's
+    consultations are scored with a single invoke instead of one invoke per
+    consultation. Not thread-safe: use one engine per worker thread.
+    """
+
+    def __init__(
+        self,
+        model_path=os.path.join(MODEL_DIR, "symptom_model.tflite"),
+        label_mapping_path=os.path.join(MODEL_DIR, "symptom_label_mapping.json"),
+        num_threads=4,
+        max_batch_size=1024,
+    ):
+        with open(label_mapping_path, "r") as f:
+            mapping = json.load(f)
+        self.symptom_to_index = mapping["symptom_to_index"]
+        self.labels = [
+            mapping["label_mapping"][str(i)]
+            for i in range(len(mapping["label_mapping"]))
+        ]
+        self.max_batch_size = max_batch_size
+
+        self.interpreter = tf.lite.Interpreter(
+            model_path=model_path, num_threads=num_threads
+        )
+        self.interpreter.allocate_tensors()
+
+    def encode(self, symptom_sets):
+        """Build the multi-hot matrix for a list of symptom-name collections.
+
+        Symptoms outside the model vocabulary are ignored.
+        """
+        X = np.zeros((len(symptom_sets), len(self.symptom_to_index)), np.float32)
+        for row, symptoms in enumerate(symptom_sets):
+            indices = [
+                self.symptom_to_index[s] for s in symptoms if s in self.symptom_to_index
+            ]
+            X[row, indices] = 1.0
+        return X
+
+    def predict_proba(self, X):
+        """Disease probabilities for a multi-hot matrix, one row per request"""
+        outputs = [
+            invoke_batch(self.interpreter, X[start : start + self.max_batch_size])
+            for start in range(0, len(X), self.max_batch_size)
+        ]
+        return np.concatenate(outputs) if outputs else np.zeros((0, len(self.labels)))
+
+    def predict(self, symptom_sets, top_k=3):
+        """Return the top_k (disease, probability) pairs for every symptom set"""
+        probs = self.predict_proba(self.encode(symptom_sets))
+        top_k = min(top_k, probs.shape[1])
+        top = np.argpartition(-probs, top_k - 1, axis=1)[:, :top_k]
+        ranked = np.take_along_axis(
+            top, np.argsort(-np.take_along_axis(probs, top, axis=1), axis=1), axis=1
+        )
+        return [
+            [(self.labels[i], float(row_probs[i])) for i in row]
+            for row, row_probs in zip(ranked, probs)
+        ]
+
+
+def benchmark(engine, num_requests=4096, batch_sizes=(1, 32, 256, 1024), seed=0):
+    """Compare throughput of the batch-1 loop with batched scoring"""
+    rng = np.random.default_rng(seed)
+    symptoms = sorted(engine.symptom_to_index)
+    requests = [
+        list(rng.choice(symptoms, size=rng.integers(1, 6), replace=False))
+        for _ in range(num_requests)
+    ]
+
+    results = {}
+    print(f"\n{'batch':>6}{'requests/s':>14}{'speedup':>9}")
+    for batch_size in batch_sizes:
+        engine.predict(requests[:batch_size])  # warm up at this batch size
+        start = time.perf_counter()
+        for i in range(0, num_requests, batch_size):
+            engine.predict(requests[i : i + batch_size])
+        results[batch_size] = num_requests / (time.perf_counter() - start)
+        print(
+            f"{batch_size:>6}{results[batch_size]:>14.0f}"
+            f"{results[batch_size] / results[batch_sizes[0]]:>8.1f}x"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Score symptom sets with the exported symptom model"
+    )
+    parser.add_argument(
+        "symptoms",
+        nargs="*",
+        help="Comma-separated symptom sets, e.g. fever,lethargy vomiting",
+    )
+    parser.add_argument(
+        "--model", default=os.path.join(MODEL_DIR, "symptom_model.tflite")
+    )
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Compare batched throughput against the batch-1 loop",
+    )
+    args = parser.parse_args()
+
+    engine = SymptomInferenceEngine(model_path=args.model)
+    if args.benchmark:
+        benchmark(engine)
+    else:
+        symptom_sets = [s.split(",") for s in args.symptoms]
+        for symptoms, ranked in zip(
+            symptom_sets, engine.predict(symptom_sets, args.top_k)
+        ):
+            print(f"{', '.join(symptoms)}:")
+            for disease, prob in ranked:
+                print(f"  {disease}: {prob:.3f}")
@@ -0,0 +1,31 @@
+# Probability of a disease's core symptom / any other symptom being present
+CORE_SYMPTOM_PROB = 0.7
+NOISE_SYMPTOM_PROB = 0.05
+
+ANIMAL_TYPES = ["dog", "cat"]
+
+
+def build_symptom_index(metadata, animal_types=ANIMAL_TYPES):
+    """Build the symptom vocabulary and its index mapping"""
+    if len(animal_types) == 1:
+        # Per-species models keep the order of the app's symptom list
+        all_symptoms = list(metadata["symptoms"][animal_types[0]])
+    else:
+        # Create a combined set of all symptoms
+        all_symptoms = set()
+        for animal_type in animal_types:
+            all_symptoms.update(metadata["symptoms"][animal_type])
+        all_symptoms = sorted(
+            list(all_symptoms)
+        )  # Convert to sorted list for consistent ordering
+
+    # Create symptom index mapping for quick lookup
+    symptom_to_index = {symptom: idx for idx, symptom in enumerate(all_symptoms)}
+    return all_symptoms, symptom_to_index
+
+
+def disease_label(animal_type, disease, animal_types):
+    """Class name of a disease; the combined model prefixes the species"""
+    if len(animal_types) == 1:
+        return disease["name"]
+    return f"{animal_type}_{disease['name']}"
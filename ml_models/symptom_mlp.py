@@ -0,0 +1,103 @@
+import numpy as np
+import argparse
+import os
+
+# Get absolute paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "assets", "models")
+
+
+def weights_filename(model_name):
+    """.npz written next to <model_name>.tflite for the NumPy runtime"""
+    return f"{model_name}_weights.npz"
+
+
+def relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def softmax(x):
+    x -= x.max(axis=1, keepdims=True)
+    np.exp(x, out=x)
+    return x / x.sum(axis=1, keepdims=True)
+
+
+ACTIVATIONS = {"relu": relu, "softmax": softmax, "linear": lambda x: x}
+
+
+class SymptomMLP:
+    """The symptom model's Dense layers evaluated with NumPy only.
+
+    Loads <model>_weights.npz (kernels, biases, activations, labels and
+    symptom vocabulary) written by train_symptom_model, so a worker can
+    score requests without importing TensorFlow. Dropout is a no-op at
+    inference and is not exported.
+    """
+
+    def __init__(
+        self, weights_path=os.path.join(MODEL_DIR, weights_filename("symptom_model"))
+    ):
+        with np.load(weights_path) as data:
+            activations = data["activations"].tolist()
+            self.layers = []
+            for i, activation in enumerate(activations):
+                if activation not in ACTIVATIONS:
+                    raise ValueError(f"Unsupported activation {activation}")
+                self.layers.append(
+                    (data[f"kernel_{i}"], data[f"bias_{i}"], ACTIVATIONS[activation])
+                )
+            self.labels = data["labels"].tolist()
+            self.symptoms = data["symptoms"].tolist()
+        self.symptom_to_index = {s: i for i, s in enumerate(self.symptoms)}
+
+    def encode(self, symptom_sets):
+        """Build the multi-hot matrix for a list of symptom-name collections.
+
+        Symptoms outside the model vocabulary are ignored.
+        """
+        X = np.zeros((len(symptom_sets), len(self.symptoms)), np.float32)
+        for row, symptoms in enumerate(symptom_sets):
+            indices = [
+                self.symptom_to_index[s] for s in symptoms if s in self.symptom_to_index
+            ]
+            X[row, indices] = 1.0
+        return X
+
+    def predict_proba(self, X):
+        """Disease probabilities for a multi-hot matrix, one row per request"""
+        h = np.asarray(X, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            h = activation(h @ kernel + bias)
+        return h
+
+    def predict(self, symptom_sets, top_k=3):
+        """Return the top_k (disease, probability) pairs for every symptom set"""
+        probs = self.predict_proba(self.encode(symptom_sets))
+        ranked = np.argsort(-probs, axis=1, kind="stable")[:, :top_k]
+        return [
+            [(self.labels[i], float(row_probs[i])) for i in row]
+            for row, row_probs in zip(ranked, probs)
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Score symptom sets with the symptom MLP in NumPy"
+    )
+    parser.add_argument(
+        "symptoms",
+        nargs="*",
+        help="Comma-separated symptom sets, e.g. fever,lethargy vomiting",
+    )
+    parser.add_argument(
+        "--weights", default=os.path.join(MODEL_DIR, weights_filename("symptom_model"))
+    )
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    mlp = SymptomMLP(args.weights)
+    symptom_sets = [s.split(",") for s in args.symptoms]
+    for symptoms, ranked in zip(symptom_sets, mlp.predict(symptom_sets, args.top_k)):
+        print(f"{', '.join(symptoms)}:")
+        for disease, prob in ranked:
+            print(f"  {disease}: {prob:.3f}")
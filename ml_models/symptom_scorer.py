@@ -0,0 +1,278 @@
+import numpy as np
+import argparse
+import json
+import os
+import time
+from symptom_metadata import (
+    ANIMAL_TYPES,
+    CORE_SYMPTOM_PROB,
+    NOISE_SYMPTOM_PROB,
+    build_symptom_index,
+    disease_label,
+)
+
+# Get absolute paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "assets", "models")
+
+
+def logit(p):
+    return np.log(p) - np.log1p(-p)
+
+
+class SymptomScorer:
+    """Exact posterior of the symptom model's synthetic training distribution.
+
+    Training data draws each core symptom of a disease with core_prob and
+    every other symptom with noise_prob, equally many samples per disease.
+    The Bayes-optimal classifier for that distribution is naive Bayes with
+    those probabilities, so scoring needs no TensorFlow: a disease's log
+    likelihood is a per-disease constant plus one weight per present
+    symptom, and the weight only differs from the noise weight for the
+    diseases listed under that symptom in the inverted index.
+    """
+
+    def __init__(
+        self,
+        metadata,
+        animal_types=ANIMAL_TYPES,
+        core_prob=CORE_SYMPTOM_PROB,
+        noise_prob=NOISE_SYMPTOM_PROB,
+    ):
+        symptoms, self.symptom_to_index = build_symptom_index(metadata, animal_types)
+        diseases = [
+            (animal_type, disease)
+            for animal_type in animal_types
+            for disease in metadata["diseases"][animal_type]
+        ]
+        self.labels = [
+            disease_label(animal_type, disease, animal_types)
+            for animal_type, disease in diseases
+        ]
+
+        # log P(symptom present | disease), (num_symptoms, num_diseases)
+        probs = np.full((len(symptoms), len(diseases)), noise_prob)
+        for label, (_, disease) in enumerate(diseases):
+            for symptom in disease["symptoms"]:
+                if symptom in self.symptom_to_index:
+                    probs[self.symptom_to_index[symptom], label] = core_prob
+        self.log_likelihood = logit(probs)
+        # Log likelihood of the all-absent vector
+        self.base = np.log1p(-probs).sum(axis=0)
+
+        # Inverted index: symptom -> diseases it is a core symptom of. Plain
+        # lists for single requests (cheaper than NumPy at this size), CSR
+        # arrays for batches
+        self.noise_weight = float(logit(noise_prob))
+        self.core_boost = float(logit(core_prob) - logit(noise_prob))
+        core = probs == core_prob
+        self.inverted_index = [np.nonzero(row)[0].tolist() for row in core]
+        self.base_scores = self.base.tolist()
+        self.index_ptr = np.concatenate([[0], np.cumsum(core.sum(axis=1))])
+        self.index_diseases = np.nonzero(core)[1]
+
+    def indices(self, symptoms):
+        """Sorted vocabulary indices of a symptom-name collection.
+
+        Unknown names are dropped and repeats counted once, like the
+        multi-hot vector the TFLite model is fed.
+        """
+        return sorted(
+            {self.symptom_to_index[s] for s in symptoms if s in self.symptom_to_index}
+        )
+
+    def log_scores(self, indices):
+        """Unnormalized log posterior (a list) of every disease for one request"""
+        offset = self.noise_weight * len(indices)
+        scores = [score + offset for score in self.base_scores]
+        for i in indices:
+            for disease in self.inverted_index[i]:
+                scores[disease] += self.core_boost
+        return scores
+
+    def log_scores_batch(self, symptom_sets):
+        """log_scores for many requests with a handful of vectorized lookups"""
+        rows = []
+        cols = []
+        for row, symptoms in enumerate(symptom_sets):
+            indices = self.indices(symptoms)
+            rows.extend([row] * len(indices))
+            cols.extend(indices)
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+
+        scores = np.tile(self.base, (len(symptom_sets), 1))
+        scores += (
+            self.noise_weight
+            * np.bincount(rows, minlength=len(symptom_sets))[:, np.newaxis]
+        )
+        counts = self.index_ptr[cols + 1] - self.index_ptr[cols]
+        starts = np.repeat(self.index_ptr[cols] - np.cumsum(counts) + counts, counts)
+        diseases = self.index_diseases[np.arange(counts.sum()) + starts]
+        np.add.at(scores, (np.repeat(rows, counts), diseases), self.core_boost)
+        return scores
+
+    def predict_proba(self, symptom_sets):
+        """Disease probabilities, one row per symptom-name collection"""
+        scores = self.log_scores_batch(symptom_sets)
+        scores -= scores.max(axis=1, keepdims=True)
+        probs = np.exp(scores)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def predict(self, symptom_sets, top_k=3):
+        """Return the top_k (disease, probability) pairs for every symptom set"""
+        probs = self.predict_proba(symptom_sets)
+        ranked = np.argsort(-probs, axis=1, kind="stable")[:, :top_k]
+        return [
+            [(self.labels[i], float(row_probs[i])) for i in row]
+            for row, row_probs in zip(ranked, probs)
+        ]
+
+    def sample(self, num_requests, seed=0):
+        """Draw (symptom sets, true labels) from the training distribution"""
+        rng = np.random.default_rng(seed)
+        symptoms = sorted(self.symptom_to_index, key=self.symptom_to_index.get)
+        probs = 1 / (1 + np.exp(-self.log_likelihood))
+        labels = rng.integers(len(self.labels), size=num_requests)
+        present = rng.random((num_requests, len(symptoms))) < probs[:, labels].T
+        return [[symptoms[i] for i in np.nonzero(row)[0]] for row in present], labels
+
+
+def benchmark(
+    scorer,
+    model_path,
+    label_mapping_path,
+    num_requests=4096,
+    batch_size=256,
+    seed=0,
+):
+    """Agreement with and throughput against the TFLite symptom model"""
+    # Imported here so scoring itself never loads TensorFlow
+    from symptom_inference import SymptomInferenceEngine
+
+    engine = SymptomInferenceEngine(
+        model_path=model_path, label_mapping_path=label_mapping_path
+    )
+    if engine.labels != scorer.labels:
+        raise ValueError("The scorer and the TFLite model have different labels")
+    symptom_sets, labels = scorer.sample(num_requests, seed)
+
+    scorer_probs = scorer.predict_proba(symptom_sets)
+    tflite_probs = engine.predict_proba(engine.encode(symptom_sets))
+    scorer_top1 = scorer_probs.argmax(axis=1)
+    tflite_top1 = tflite_probs.argmax(axis=1)
+    # Requests whose best two diseases are near-ties are a coin flip for both
+    top2 = np.sort(scorer_probs, axis=1)[:, -2:]
+    clear = top2[:, 1] - top2[:, 0] > 0.1
+    results = {
+        "requests": num_requests,
+        "top1_agreement": float(np.mean(scorer_top1 == tflite_top1)),
+        "top1_agreement_clear": float(
+            np.mean(scorer_top1[clear] == tflite_top1[clear])
+        ),
+        "clear_fraction": float(np.mean(clear)),
+        "scorer_accuracy": float(np.mean(scorer_top1 == labels)),
+        "tflite_accuracy": float(np.mean(tflite_top1 == labels)),
+        "mean_abs_prob_diff": float(np.abs(scorer_probs - tflite_probs).mean()),
+    }
+
+    def per_request_us(score, batch):
+        score(symptom_sets[:batch])  # warm up
+        start = time.perf_counter()
+        for i in range(0, num_requests, batch):
+            score(symptom_sets[i : i + batch])
+        return (time.perf_counter() - start) / num_requests * 1e6
+
+    indices = [scorer.indices(symptoms) for symptoms in symptom_sets]
+    start = time.perf_counter()
+    for request in indices:
+        scorer.log_scores(request)
+    results["scorer_lookup_us"] = (time.perf_counter() - start) / num_requests * 1e6
+    results["scorer_batch1_us"] = per_request_us(scorer.predict_proba, 1)
+    results["scorer_batch_us"] = per_request_us(scorer.predict_proba, batch_size)
+    results["tflite_batch1_us"] = per_request_us(
+        lambda s: engine.predict_proba(engine.encode(s)), 1
+    )
+    results["tflite_batch_us"] = per_request_us(
+        lambda s: engine.predict_proba(engine.encode(s)), batch_size
+    )
+
+    print(f"\nTop-1 agreement with TFLite: {results['top1_agreement']:.3f}")
+    print(
+        f"  on the {results['clear_fraction']:.0%} of requests without a near-tie: "
+        f"{results['top1_agreement_clear']:.3f}"
+    )
+    print(
+        f"Accuracy on sampled requests: scorer {results['scorer_accuracy']:.3f}, "
+        f"TFLite {results['tflite_accuracy']:.3f}"
+    )
+    print(f"Mean |probability difference|: {results['mean_abs_prob_diff']:.4f}")
+    print(f"\n{'path':<36}{'us/request':>12}")
+    for name, key in [
+        ("scorer log_scores (indices)", "scorer_lookup_us"),
+        ("scorer predict_proba, batch 1", "scorer_batch1_us"),
+        (f"scorer predict_proba, batch {batch_size}", "scorer_batch_us"),
+        ("TFLite, batch 1", "tflite_batch1_us"),
+        (f"TFLite, batch {batch_size}", "tflite_batch_us"),
+    ]:
+        print(f"{name:<36}{results[key]:>12.2f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Score symptom sets without TensorFlow"
+    )
+    parser.add_argument(
+        "symptoms",
+        nargs="*",
+        help="Comma-separated symptom sets, e.g. fever,lethargy vomiting",
+    )
+    parser.add_argument(
+        "--metadata", default=os.path.join(MODEL_DIR, "symptoms_metadata.json")
+    )
+    parser.add_argument(
+        "--animal",
+        choices=ANIMAL_TYPES,
+        help="Score one species' diseases, as the per-species models do",
+    )
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Compare agreement and throughput with the TFLite model",
+    )
+    parser.add_argument(
+        "--model",
+        default=None,
+        help="TFLite model for --benchmark (default: the matching symptom model)",
+    )
+    parser.add_argument("--output", help="Save the benchmark results as JSON")
+    args = parser.parse_args()
+
+    with open(args.metadata, "r") as f:
+        metadata = json.load(f)
+    scorer = SymptomScorer(
+        metadata, animal_types=[args.animal] if args.animal else ANIMAL_TYPES
+    )
+
+    if args.benchmark:
+        prefix = f"symptoms_{args.animal}" if args.animal else "symptom"
+        results = benchmark(
+            scorer,
+            args.model or os.path.join(MODEL_DIR, f"{prefix}_model.tflite"),
+            os.path.join(
+                os.path.dirname(args.metadata), f"{prefix}_label_mapping.json"
+            ),
+        )
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+    else:
+        symptom_sets = [s.split(",") for s in args.symptoms]
+        for symptoms, ranked in zip(
+            symptom_sets, scorer.predict(symptom_sets, args.top_k)
+        ):
+            print(f"{', '.join(symptoms)}:")
+            for disease, prob in ranked:
+                print(f"  {disease}: {prob:.3f}")
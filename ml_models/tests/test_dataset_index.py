@@ -0,0 +1,31 @@
+import os
+from PIL import Image
+from dataset_index import (
+    build_dataset_index,
+    index_files,
+    index_is_current,
+    refresh_file_stats,
+)
+
+
+def write_image(path, size):
+    Image.new("RGB", size, "white").save(path)
+
+
+def test_in_place_edit_updates_file_stats(tmp_path):
+    path = str(tmp_path / "Beagle_1.jpg")
+    write_image(path, (32, 24))
+    index = build_dataset_index([(path, "dog_Beagle")], "key", [str(tmp_path)])
+    assert refresh_file_stats(index) == 0
+
+    write_image(path, (64, 48))
+    os.utime(path, (1_000_000_000, 1_000_000_000))
+
+    # Editing a file in place leaves its directory's mtime alone
+    os.utime(tmp_path, (index["directories"][str(tmp_path)],) * 2)
+    assert index_is_current(index, "key")
+    assert refresh_file_stats(index) == 1
+    ((_, _, size, mtime),) = index_files(index)
+    assert (size, mtime) == (os.path.getsize(path), 1_000_000_000)
+    assert index["labels"]["dog_Beagle"]["widths"] == [64]
+    assert index["labels"]["dog_Beagle"]["heights"] == [48]
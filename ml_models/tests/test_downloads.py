@@ -0,0 +1,128 @@
+import http.server
+import io
+import os
+import re
+import tarfile
+import threading
+import pytest
+from build_manifest import hash_file
+from downloads import download_and_extract, download_file
+
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serve files from server.directory with single-range GET support"""
+
+    def do_GET(self):
+        path = os.path.join(self.server.directory, self.path.lstrip("/"))
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+
+        match = re.match(r"bytes=(\d+)-$", self.headers.get("Range", ""))
+        start = int(match.group(1)) if match else 0
+        if start >= len(data) and match:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(data)}")
+            self.end_headers()
+            return
+
+        self.send_response(206 if match else 200)
+        if match:
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}"
+            )
+        self.send_header("Content-Length", str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+        self.server.bytes_sent += len(data) - start
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_fixture_archive(path, members):
+    """Write a .tar.gz holding {name: bytes}"""
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+@pytest.fixture
+def members():
+    return {
+        f"images/{name}_{i}.jpg": os.urandom(50_000)
+        for name in ("Keep", "Skip")
+        for i in range(5)
+    }
+
+
+@pytest.fixture
+def archive(tmp_path, members):
+    served = tmp_path / "served"
+    served.mkdir()
+    write_fixture_archive(served / "fixture.tar.gz", members)
+    return served / "fixture.tar.gz"
+
+
+@pytest.fixture
+def server(archive):
+    """Local HTTP server with Range support for the fixture archive"""
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), RangeRequestHandler)
+    server.directory = str(archive.parent)
+    server.bytes_sent = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/fixture.tar.gz"
+
+
+def select(name):
+    return name if "/Keep_" in name else None
+
+
+def test_interrupted_download_resumes(tmp_path, archive, server, url):
+    archive_bytes = archive.read_bytes()
+    half = len(archive_bytes) // 2
+    (tmp_path / "fixture.tar.gz.part").write_bytes(archive_bytes[:half])
+
+    download_file(url, tmp_path / "fixture.tar.gz", hash_file(archive).hexdigest())
+
+    assert server.bytes_sent == len(archive_bytes) - half
+    assert (tmp_path / "fixture.tar.gz").read_bytes() == archive_bytes
+
+
+def test_verified_download_is_not_fetched_again(tmp_path, archive, server, url):
+    sha256 = hash_file(archive).hexdigest()
+    download_file(url, tmp_path / "fixture.tar.gz", sha256)
+    sent = server.bytes_sent
+
+    download_file(url, tmp_path / "fixture.tar.gz", sha256)
+
+    assert server.bytes_sent == sent
+
+
+def test_checksum_mismatch_is_rejected(tmp_path, server, url):
+    with pytest.raises(ValueError):
+        download_file(url, tmp_path / "bad.tar.gz", "0" * 64)
+
+
+def test_selected_members_are_extracted_once(tmp_path, archive, members, url):
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    archives = [(url, hash_file(archive).hexdigest(), select)]
+
+    assert download_and_extract(archives, dest) == {"fixture.tar.gz": (5, 0)}
+    extracted = sorted(p.name for p in (dest / "images").iterdir())
+    assert extracted == [f"Keep_{i}.jpg" for i in range(5)]
+    assert (dest / "images" / "Keep_0.jpg").read_bytes() == members["images/Keep_0.jpg"]
+
+    # Already-extracted files are skipped
+    assert download_and_extract(archives, dest) == {"fixture.tar.gz": (0, 5)}
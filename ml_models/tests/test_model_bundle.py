@@ -0,0 +1,53 @@
+import json
+import os
+import pytest
+from model_bundle import (
+    BUNDLE_EXTENSION,
+    ModelBundle,
+    bundles_from_assets,
+    label_list,
+    write_bundle,
+)
+
+ASSETS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "assets",
+    "models",
+)
+
+
+def test_fixture_round_trip(tmp_path):
+    expected = {
+        "labels": ["dog_Mange", "cat_Feline Acne", "ünïcode"],
+        "inputs": ["fever", "vomiting"],
+        "groups": {"dog": ["Mange"], "cat": ["Feline Acne", ""]},
+        "input_shape": [1, 2],
+        "output_shape": [1, 3],
+        "quantization": {
+            "input": {"scale": 0.00390625, "zero_point": 0},
+            "output": {"scale": 0.00390625, "zero_point": -128},
+        },
+        "attributes": {"rescale": "1./255"},
+    }
+    path = tmp_path / ("fixture" + BUNDLE_EXTENSION)
+    write_bundle(str(path), **expected)
+
+    bundle = ModelBundle(str(path))
+    assert bundle.to_dict() == expected
+    assert bundle.input_index == {"fever": 0, "vomiting": 1}
+
+
+def test_asset_metadata_round_trip(tmp_path):
+    written = bundles_from_assets(ASSETS_DIR, str(tmp_path))
+    if not written:
+        pytest.skip(f"No model metadata in {ASSETS_DIR}")
+
+    for path, json_files in written.items():
+        bundle = ModelBundle(path)
+        with open(os.path.join(ASSETS_DIR, json_files[0]), "r") as f:
+            metadata = json.load(f)
+        if "label_mapping" in metadata:
+            assert bundle.labels == label_list(metadata["label_mapping"]), path
+        if "symptoms" in metadata:
+            assert bundle.inputs == metadata["symptoms"], path
+            assert bundle.input_index == metadata["symptom_to_index"], path
@@ -0,0 +1,61 @@
+import tensorflow as tf
+import numpy as np
+import os
+import shutil
+import pytest
+import train_symptom_model
+from symptom_mlp import SymptomMLP, weights_filename
+from tflite_utils import invoke_batch
+
+MODEL_NAME = "symptoms_dog_model"
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    """Train and export a small dog symptom model into a temporary MODEL_DIR"""
+    model_dir = tmp_path_factory.mktemp("models")
+    shutil.copy(
+        os.path.join(train_symptom_model.MODEL_DIR, "symptoms_metadata.json"),
+        model_dir,
+    )
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(train_symptom_model, "MODEL_DIR", str(model_dir))
+        metadata = train_symptom_model.load_metadata()
+        X, y = train_symptom_model.generate_data(metadata, 20, 0.05, True, 0, ["dog"])
+        train_symptom_model.fit_and_export(
+            X,
+            y,
+            MODEL_NAME,
+            seed=0,
+            animal_types=["dog"],
+            hidden_units=train_symptom_model.species_hidden_units(
+                X.shape[1], len(np.unique(y))
+            ),
+        )
+    return model_dir
+
+
+def test_matches_tflite(exported):
+    mlp = SymptomMLP(str(exported / weights_filename(MODEL_NAME)))
+    interpreter = tf.lite.Interpreter(model_path=str(exported / f"{MODEL_NAME}.tflite"))
+    interpreter.allocate_tensors()
+
+    rng = np.random.default_rng(0)
+    X = (rng.random((2048, len(mlp.symptoms))) < 0.15).astype(np.float32)
+    mlp_probs = mlp.predict_proba(X)
+    tflite_probs = invoke_batch(interpreter, X)
+
+    assert np.abs(mlp_probs - tflite_probs).max() <= 1e-4
+    agreement = np.mean(mlp_probs.argmax(axis=1) == tflite_probs.argmax(axis=1))
+    assert agreement >= 0.999
+
+
+def test_predict_ranks_known_symptoms(exported):
+    mlp = SymptomMLP(str(exported / weights_filename(MODEL_NAME)))
+
+    (ranked,) = mlp.predict([mlp.symptoms[:2]], top_k=3)
+
+    assert len(ranked) == 3
+    probs = [prob for _, prob in ranked]
+    assert probs == sorted(probs, reverse=True)
+    assert all(label in mlp.labels for label, _ in ranked)
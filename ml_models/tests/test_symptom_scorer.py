@@ -0,0 +1,31 @@
+import json
+import os
+import numpy as np
+import pytest
+from symptom_scorer import MODEL_DIR, SymptomScorer
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    with open(os.path.join(MODEL_DIR, "symptoms_metadata.json"), "r") as f:
+        return SymptomScorer(json.load(f))
+
+
+def test_repeated_symptom_counts_once(scorer):
+    symptoms = sorted(scorer.symptom_to_index)[:2]
+    repeated = [symptoms[0], symptoms[1], symptoms[0], "not a symptom"]
+
+    assert scorer.indices(repeated) == scorer.indices(symptoms)
+    assert scorer.log_scores(scorer.indices(repeated)) == pytest.approx(
+        scorer.log_scores(scorer.indices(symptoms))
+    )
+    np.testing.assert_allclose(
+        scorer.predict_proba([repeated]), scorer.predict_proba([symptoms])
+    )
+
+
+def test_batch_matches_single_requests(scorer):
+    symptom_sets, _ = scorer.sample(64)
+    expected = [scorer.log_scores(scorer.indices(s)) for s in symptom_sets]
+
+    np.testing.assert_allclose(scorer.log_scores_batch(symptom_sets), expected)
@@ -0,0 +1,21 @@
+import pytest
+import training_utils
+from training_utils import StepTimer
+
+
+def test_samples_per_sec_counts_train_steps_only(monkeypatch):
+    clock = iter([0.0, 0.1, 0.2, 0.3, 5.0])
+    monkeypatch.setattr(training_utils.time, "perf_counter", lambda: next(clock))
+    timer = StepTimer(batch_size=32)
+    logs = {}
+
+    timer.on_epoch_begin(0)
+    for batch in range(3):
+        timer.on_train_batch_end(batch)
+    # Validation and other callbacks run before on_epoch_end
+    next(clock)
+    timer.on_epoch_end(0, logs)
+
+    assert timer.epoch_samples_per_sec == [pytest.approx(3 * 32 / 0.3)]
+    assert logs["images_per_sec"] == pytest.approx(3 * 32 / 0.3)
+    assert round(logs["step_time_ms"]) == 100
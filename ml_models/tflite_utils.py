@@ -0,0 +1,146 @@
+import tensorflow as tf
+import numpy as np
+import os
+import time
+
+# Samples fed to the int8 converter to calibrate activation ranges
+NUM_REPRESENTATIVE_SAMPLES = 200
+
+
+def convert_to_int8(model, representative_samples):
+    """Convert a Keras model to a full-integer TFLite model with uint8 I/O.
+
+    representative_samples is an iterable of single, already preprocessed
+    input samples; they calibrate the activation ranges of every tensor.
+    """
+
+    def representative_dataset():
+        for sample in representative_samples:
+            yield [np.asarray(sample, dtype=np.float32)[np.newaxis]]
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+    return converter.convert()
+
+
+def quantization_params(tflite_model):
+    """Read dtype, shape, scale and zero point of the model input and output"""
+    interpreter = tf.lite.Interpreter(model_content=tflite_model)
+
+    def describe(detail):
+        scale, zero_point = detail["quantization"]
+        return {
+            "dtype": np.dtype(detail["dtype"]).name,
+            "shape": detail["shape"].tolist(),
+            "scale": float(scale),
+            "zero_point": int(zero_point),
+        }
+
+    return {
+        "input": describe(interpreter.get_input_details()[0]),
+        "output": describe(interpreter.get_output_details()[0]),
+    }
+
+
+def measure_latency(tflite_model, runs=50, num_threads=4):
+    """Median single-invoke latency in milliseconds on this CPU"""
+    interpreter = tf.lite.Interpreter(
+        model_content=tflite_model, num_threads=num_threads
+    )
+    interpreter.allocate_tensors()
+    input_detail = interpreter.get_input_details()[0]
+    interpreter.set_tensor(
+        input_detail["index"],
+        np.zeros(input_detail["shape"], dtype=input_detail["dtype"]),
+    )
+
+    return float(np.median(time_invokes(interpreter, runs))) * 1000
+
+
+def measure_load_ms(tflite_model, runs=5):
+    """Median time to create an interpreter and allocate its tensors, in ms"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        interpreter = tf.lite.Interpreter(model_content=tflite_model)
+        interpreter.allocate_tensors()
+        timings.append(time.perf_counter() - start)
+        del interpreter
+    return float(np.median(timings)) * 1000
+
+
+def time_invokes(interpreter, runs, warmup=1):
+    """Time repeated invokes of an allocated interpreter, in seconds"""
+    # Warm up first so one-off allocations are not timed
+    for _ in range(warmup):
+        interpreter.invoke()
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        interpreter.invoke()
+        timings.append(time.perf_counter() - start)
+    return np.array(timings)
+
+
+def save_int8_model(model, representative_samples, model_dir, name, float_model):
+    """Export the int8 variant of a model next to its float version.
+
+    Writes <name>_int8.tflite, prints a size and latency comparison against
+    the float model and returns the metadata entry describing the export.
+    """
+    print("Converting to full-integer (int8) TFLite format...")
+    int8_model = convert_to_int8(model, representative_samples)
+
+    filename = f"{name}_int8.tflite"
+    with open(os.path.join(model_dir, filename), "wb") as f:
+        f.write(int8_model)
+
+    float_ms = measure_latency(float_model)
+    int8_ms = measure_latency(int8_model)
+    print(f"\n{'model':<8}{'size (KB)':>12}{'latency (ms)':>15}")
+    print(f"{'float':<8}{len(float_model) / 1024:>12.1f}{float_ms:>15.3f}")
+    print(f"{'int8':<8}{len(int8_model) / 1024:>12.1f}{int8_ms:>15.3f}")
+    print(
+        f"int8 is {len(float_model) / len(int8_model):.1f}x smaller and "
+        f"{float_ms / int8_ms:.1f}x faster\n"
+    )
+
+    return {
+        "model": filename,
+        "size_bytes": len(int8_model),
+        "float_size_bytes": len(float_model),
+        "latency_ms": int8_ms,
+        "float_latency_ms": float_ms,
+        **quantization_params(int8_model),
+    }
+
+
+def invoke_batch(interpreter, X):
+    """Run a batch through an interpreter and return float32 outputs.
+
+    The interpreter must already have allocated tensors. The input tensor
+    is resized when the batch size changes, and uint8 full-integer models
+    are quantized/dequantized with their own params.
+    """
+    input_detail = interpreter.get_input_details()[0]
+    if list(input_detail["shape"]) != list(X.shape):
+        interpreter.resize_tensor_input(input_detail["index"], list(X.shape))
+        interpreter.allocate_tensors()
+
+    input_scale, input_zero_point = input_detail["quantization"]
+    if input_scale:
+        X = np.clip(np.round(X / input_scale + input_zero_point), 0, 255)
+    interpreter.set_tensor(input_detail["index"], X.astype(input_detail["dtype"]))
+    interpreter.invoke()
+
+    output_detail = interpreter.get_output_details()[0]
+    output = interpreter.get_tensor(output_detail["index"])
+    output_scale, output_zero_point = output_detail["quantization"]
+    if output_scale:
+        return (output.astype(np.float32) - output_zero_point) * output_scale
+    return output
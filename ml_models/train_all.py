@@ -0,0 +1,212 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+# (module, training function, relative cost used to share out CPU threads)
+JOBS = {
+    "symptom": ("train_symptom_model", "train_model", 1),
+    "skin": ("train_skin_disease_model", "create_and_train_model", 3),
+    "breed": ("train_breed_model", "train_model", 4),
+}
+
+
+def allocate_threads(job_names, total_threads):
+    """Split total_threads across jobs in proportion to their cost.
+
+    Every job gets at least one intra-op thread, so the sum can exceed
+    total_threads only when there are more jobs than threads.
+    """
+    weights = {name: JOBS[name][2] for name in job_names}
+    total_weight = sum(weights.values())
+    return {
+        name: max(1, int(total_threads * weight / total_weight))
+        for name, weight in weights.items()
+    }
+
+
+def history_to_dict(history):
+    """Turn the History object(s) a trainer returns into plain lists of floats"""
+    if history is None:
+        return None
+    if isinstance(history, (list, tuple)):
+        return [history_to_dict(h) for h in history]
+    if isinstance(history, dict):
+        return {key: history_to_dict(value) for key, value in history.items()}
+    if hasattr(history, "history"):
+        return {
+            metric: [float(v) for v in values]
+            for metric, values in history.history.items()
+        }
+    return history
+
+
+def run_job(name, intra_threads, inter_threads, kwargs):
+    """Run one trainer in this (fresh) process with pinned TF thread pools"""
+    # Native libraries read these at load time, before TensorFlow is imported
+    os.environ["OMP_NUM_THREADS"] = str(intra_threads)
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(intra_threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = str(inter_threads)
+
+    import tensorflow as tf
+
+    tf.config.threading.set_intra_op_parallelism_threads(intra_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_threads)
+
+    module_name, function_name, _ = JOBS[name]
+    result = {
+        "threads": {"intra_op": intra_threads, "inter_op": inter_threads},
+        "kwargs": kwargs,
+    }
+    start = time.perf_counter()
+    try:
+        train = getattr(importlib.import_module(module_name), function_name)
+        history = train(**kwargs)
+        result["status"] = "skipped" if history is None else "trained"
+        result["history"] = history_to_dict(history)
+    except BaseException as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def job_kwargs(name, args):
+    """Trainer arguments for one job from the orchestrator CLI"""
+    kwargs = {"int8": args.int8, "force": args.force, "profile": args.profile}
+    if args.seed is not None:
+        kwargs["seed"] = args.seed
+    if name == "skin" and args.skin_streaming:
+        kwargs["streaming"] = True
+    if name in ("skin", "breed"):
+        kwargs["mixed_precision"] = args.mixed_precision
+        kwargs["jit_compile"] = args.jit_compile
+    if name == "breed":
+        kwargs["streaming"] = args.breed_streaming
+        kwargs["source"] = args.breed_source
+    return kwargs
+
+
+def train_all(job_names, total_threads, kwargs_by_job, inter_threads=1):
+    """Train the selected models concurrently, one spawned process per model"""
+    threads = allocate_threads(job_names, total_threads)
+    report = {
+        "machine": {
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "total_threads": total_threads,
+        "jobs": {},
+    }
+
+    start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=len(job_names), mp_context=context
+    ) as executor:
+        futures = {}
+        for name in job_names:
+            print(f"Starting {name} training with {threads[name]} threads")
+            futures[name] = executor.submit(
+                run_job, name, threads[name], inter_threads, kwargs_by_job[name]
+            )
+
+        for name, future in futures.items():
+            report["jobs"][name] = future.result()
+            print(
+                f"{name} {report['jobs'][name]['status']} "
+                f"in {report['jobs'][name]['seconds']:.1f}s"
+            )
+
+    report["total_seconds"] = time.perf_counter() - start
+    return report
+
+
+def print_summary(report):
+    """Print a table of the report"""
+    print(f"\n{'job':<10}{'status':>9}{'threads':>9}{'seconds':>10}  final metrics")
+    for name, result in report["jobs"].items():
+        histories = result.get("history")
+        if isinstance(histories, dict):
+            histories = [histories]
+        final = ""
+        if histories:
+            last = histories[-1]
+            final = ", ".join(
+                f"{metric} {values[-1]:.3f}"
+                for metric, values in last.items()
+                if "accuracy" in metric and values
+            )
+        print(
+            f"{name:<10}{result['status']:>9}{result['threads']['intra_op']:>9}"
+            f"{result['seconds']:>10.1f}  {final or result.get('error', '')}"
+        )
+    print(f"Total wall time: {report['total_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Train the symptom, skin and breed models in parallel processes"
+    )
+    parser.add_argument(
+        "jobs", nargs="*", help=f"Models to train: {', '.join(JOBS)} (default: all)"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=os.cpu_count(),
+        help="CPU threads to share across the jobs (default: all cores)",
+    )
+    parser.add_argument("--inter-op-threads", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument(
+        "--force", action="store_true", help="Retrain up-to-date models too"
+    )
+    parser.add_argument(
+        "--mixed-precision",
+        action="store_true",
+        help="Train the CNNs in bfloat16 where the CPU supports it",
+    )
+    parser.add_argument(
+        "--jit-compile", action="store_true", help="XLA-compile the CNN train steps"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write a <model>_profile.json timing report for every job",
+    )
+    parser.add_argument("--skin-streaming", action="store_true")
+    parser.add_argument("--breed-streaming", action="store_true")
+    parser.add_argument(
+        "--breed-source", choices=["datasets", "folders"], default="datasets"
+    )
+    parser.add_argument("--output", default="training_report.json")
+    args = parser.parse_args()
+
+    job_names = args.jobs or list(JOBS)
+    unknown = [name for name in job_names if name not in JOBS]
+    if unknown:
+        parser.error(f"Unknown job(s): {', '.join(unknown)}")
+
+    report = train_all(
+        job_names,
+        args.threads,
+        {name: job_kwargs(name, args) for name in job_names},
+        inter_threads=args.inter_op_threads,
+    )
+    print_summary(report)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report saved to {args.output}")
+
+    if any(result["status"] == "failed" for result in report["jobs"].values()):
+        sys.exit(1)
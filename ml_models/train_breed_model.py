@@ -1,18 +1,59 @@
 import tensorflow as tf
 import numpy as np
+import argparse
+import glob
 import os
 import sys
-import tarfile
+import time
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.preprocessing.image import ImageDataGenerator
 import json
-import requests
 from PIL import Image
 from pathlib import Path
 import shutil
 import zipfile
 from sklearn.preprocessing import LabelEncoder
 import cv2
+from feature_cache import (
+    array_batches,
+    cached_embeddings,
+    create_feature_extractor,
+    fit_head,
+)
+from build_manifest import hash_inputs, is_up_to_date, record_build, source_files
+from tflite_utils import NUM_REPRESENTATIVE_SAMPLES, measure_latency, save_int8_model
+from training_utils import float32_copy, set_precision
+from profiling import Profiler
+from model_bundle import BUNDLE_EXTENSION, label_list, write_bundle
+from downloads import download_and_extract
+from dataset_index import (
+    build_dataset_index,
+    index_files,
+    index_is_current,
+    load_dataset_index,
+    refresh_file_stats,
+    save_dataset_index,
+    stratified_split,
+)
+from distillation import (
+    DEFAULT_HARD_LABEL_WEIGHT,
+    DEFAULT_STUDENTS,
+    DEFAULT_TEMPERATURE,
+    create_student,
+    distill,
+    evaluate_accuracy,
+    parse_students,
+    print_tradeoff,
+    student_name,
+)
+from compression import compress_model
+from model_sweep import (
+    DEFAULT_LATENCY_BUDGET_MS,
+    budget_key,
+    print_sweep,
+    sweep_candidates,
+    sweep_metadata,
+)
 
 # Define breeds for each animal type
 BREEDS = {
@@ -67,8 +108,24 @@ MODEL_DIR = os.path.join("..", "assets", "models")
 DATASET_ROOT = r"C:\Users\hp\Downloads\dataset"
 DOG_DATASET_PATH = os.path.join(DATASET_ROOT, "dog breed", "images")
 CAT_DATASET_PATH = os.path.join(DATASET_ROOT, "cat breed", "images")
+STANFORD_DOGS_URL = "http://vision.stanford.edu/aditya86/ImageNetDogs/images.tar"
+OXFORD_PETS_URL = "https://www.robots.ox.ac.uk/~vgg/data/pets/data/images.tar.gz"
+# Persisted breed -> files index, one per dataset source
+DATASET_INDEX_PATH = os.path.join("datasets", "breed_index_{source}.json.gz")
+# Indexes already loaded by this process, by source; checked once per run
+LOADED_INDEXES = {}
 IMAGE_SIZE = (224, 224)
 BATCH_SIZE = 32
+VALIDATION_SPLIT = 0.2
+# Decoded images kept in the shuffle buffer once file order is frozen by cache()
+SHUFFLE_BUFFER_SIZE = 512
+# Images per preprocessed .npy shard (~150 MB of uint8 at 224x224)
+IMAGE_CACHE_SHARD_SIZE = 1024
+# Per-batch augmentation strengths, matching the Keras layers used before
+ROTATION_FACTOR = 0.2
+ZOOM_FACTOR = 0.2
+BRIGHTNESS_FACTOR = 0.2
+CONTRAST_FACTOR = 0.2
 
 
 # Add debug function
@@ -94,7 +151,7 @@ def ensure_directories():
         raise
 
 
-def create_model(num_classes):
+def create_model(num_classes, jit_compile=False):
     """Create and compile the model with improved architecture"""
     # Use EfficientNetB0 as base model (better performance than MobileNetV2)
     base_model = tf.keras.applications.EfficientNetB0(
@@ -114,7 +171,8 @@ def create_model(num_classes):
             tf.keras.layers.Dropout(0.5),
             tf.keras.layers.Dense(256, activation="relu"),
             tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(num_classes, activation="softmax"),
+            # Softmax stays float32 under mixed precision for stable outputs
+            tf.keras.layers.Dense(num_classes, activation="softmax", dtype="float32"),
         ]
     )
 
@@ -125,6 +183,7 @@ def create_model(num_classes):
         optimizer=optimizer,
         loss="sparse_categorical_crossentropy",
         metrics=["accuracy"],
+        jit_compile=jit_compile,
     )
 
     return model, base_model
@@ -277,33 +336,57 @@ def create_and_save_model():
         return False
 
 
-def download_and_extract_dataset():
-    """Download and extract the Stanford Dogs and Oxford-IIIT Pet datasets"""
-    # Stanford Dogs Dataset
-    stanford_url = "http://vision.stanford.edu/aditya86/ImageNetDogs/images.tar"
-    oxford_url = "https://www.robots.ox.ac.uk/~vgg/data/pets/data/images.tar.gz"
+def stanford_breed_name(dir_name):
+    """Breed name of a Stanford Dogs folder such as n02088364-beagle"""
+    return dir_name.split("-")[1].replace("_", " ")
 
-    datasets_dir = Path("datasets")
-    datasets_dir.mkdir(exist_ok=True)
 
-    for url in [stanford_url, oxford_url]:
-        filename = url.split("/")[-1]
-        filepath = datasets_dir / filename
+def oxford_breed_name(stem):
+    """Breed name of an Oxford-IIIT Pet image such as Persian_12"""
+    return stem.split("_")[0].replace("_", " ")
 
-        if not filepath.exists():
-            print(f"Downloading {filename}...")
-            response = requests.get(url, stream=True)
-            with open(filepath, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
 
-        print(f"Extracting {filename}...")
-        if filename.endswith(".tar.gz"):
-            with tarfile.open(filepath, "r:gz") as tar:
-                tar.extractall(path=datasets_dir)
-        elif filename.endswith(".tar"):
-            with tarfile.open(filepath, "r") as tar:
-                tar.extractall(path=datasets_dir)
+def stanford_member_path(name):
+    """Where create_dataset reads a Stanford Dogs member, None if not in BREEDS"""
+    parts = name.split("/")
+    if len(parts) != 3 or parts[0] != "Images" or "-" not in parts[1]:
+        return None
+    if not parts[2].endswith(".jpg"):
+        return None
+    return name if stanford_breed_name(parts[1]) in BREEDS["dog"] else None
+
+
+def oxford_member_path(name):
+    """Where create_dataset reads an Oxford-IIIT Pet member, None if not in BREEDS"""
+    parts = name.split("/")
+    if len(parts) != 2 or parts[0] != "images" or not parts[1].endswith(".jpg"):
+        return None
+    if oxford_breed_name(Path(parts[1]).stem) not in BREEDS["cat"]:
+        return None
+    return f"oxford-iiit-pet/images/{parts[1]}"
+
+
+def download_and_extract_dataset(
+    datasets_dir="datasets",
+    stanford_url=STANFORD_DOGS_URL,
+    oxford_url=OXFORD_PETS_URL,
+    sha256=None,
+):
+    """Download and extract the Stanford Dogs and Oxford-IIIT Pet datasets.
+
+    Both archives download concurrently and resume where an interrupted run
+    stopped; extraction streams each archive once and writes only images of
+    breeds in BREEDS, skipping files already extracted. sha256 optionally
+    pins {url: digest} for the archives.
+    """
+    sha256 = sha256 or {}
+    return download_and_extract(
+        [
+            (stanford_url, sha256.get(stanford_url), stanford_member_path),
+            (oxford_url, sha256.get(oxford_url), oxford_member_path),
+        ],
+        datasets_dir,
+    )
 
 
 def preprocess_image(image_path, target_size=(224, 224)):
@@ -321,60 +404,20 @@ def create_dataset():
     val_data = []
     val_labels = []
 
-    datasets_dir = Path("datasets")
-
-    # Process Stanford Dogs Dataset
-    stanford_dir = datasets_dir / "Images"
-    if stanford_dir.exists():
-        print("Processing Stanford Dogs Dataset...")
-        for breed_dir in stanford_dir.iterdir():
-            if breed_dir.is_dir():
-                breed_name = breed_dir.name.split("-")[1].replace("_", " ")
-                # Only process if breed is in our BREEDS list
-                if breed_name in BREEDS["dog"]:
-                    images = list(breed_dir.glob("*.jpg"))
-
-                    # Split into train and validation
-                    split_idx = int(len(images) * 0.8)
-                    train_images = images[:split_idx]
-                    val_images = images[split_idx:]
-
-                    # Process training images
-                    for img_path in train_images:
-                        try:
-                            img_array = preprocess_image(str(img_path))
-                            train_data.append(img_array)
-                            train_labels.append(f"dog_{breed_name}")
-                        except Exception as e:
-                            print(f"Error processing {img_path}: {e}")
-
-                    # Process validation images
-                    for img_path in val_images:
-                        try:
-                            img_array = preprocess_image(str(img_path))
-                            val_data.append(img_array)
-                            val_labels.append(f"dog_{breed_name}")
-                        except Exception as e:
-                            print(f"Error processing {img_path}: {e}")
-
-    # Process Oxford-IIIT Pet Dataset
-    oxford_dir = datasets_dir / "oxford-iiit-pet" / "images"
-    if oxford_dir.exists():
-        print("Processing Oxford-IIIT Pet Dataset...")
-        for img_path in oxford_dir.glob("*.jpg"):
-            breed_name = img_path.stem.split("_")[0].replace("_", " ")
-            # Check if it's a cat breed in our BREEDS list
-            if breed_name in BREEDS["cat"]:
-                try:
-                    img_array = preprocess_image(str(img_path))
-                    if np.random.random() < 0.8:  # 80% for training
-                        train_data.append(img_array)
-                        train_labels.append(f"cat_{breed_name}")
-                    else:  # 20% for validation
-                        val_data.append(img_array)
-                        val_labels.append(f"cat_{breed_name}")
-                except Exception as e:
-                    print(f"Error processing {img_path}: {e}")
+    train_files, val_files = stratified_split(
+        breed_dataset_index("datasets"), VALIDATION_SPLIT
+    )
+    print(f"Processing {len(train_files) + len(val_files)} breed images...")
+    for files, data, labels in [
+        (train_files, train_data, train_labels),
+        (val_files, val_data, val_labels),
+    ]:
+        for img_path, label in files:
+            try:
+                data.append(preprocess_image(img_path))
+                labels.append(label)
+            except Exception as e:
+                print(f"Error processing {img_path}: {e}")
 
     if not train_data:
         raise Exception("No valid breed images found in the datasets")
@@ -387,49 +430,787 @@ def create_dataset():
     )
 
 
-def train_model():
-    """Train the model with improved training process"""
-    print("Starting model training...")
-
-    # Create data augmentation layer
-    data_augmentation = tf.keras.Sequential(
-        [
-            tf.keras.layers.RandomFlip("horizontal"),
-            tf.keras.layers.RandomRotation(0.2),
-            tf.keras.layers.RandomZoom(0.2),
-            tf.keras.layers.RandomBrightness(0.2),
-            tf.keras.layers.RandomContrast(0.2),
+def list_breed_sources(source="datasets"):
+    """List (file pattern, label) pairs for every breed in BREEDS.
+
+    source="datasets" matches the Stanford Dogs / Oxford-IIIT layout read by
+    create_dataset, source="folders" the per-breed folders under
+    DOG_DATASET_PATH / CAT_DATASET_PATH read by load_and_preprocess_dataset.
+    """
+    sources = []
+
+    if source == "datasets":
+        datasets_dir = Path("datasets")
+
+        stanford_dir = datasets_dir / "Images"
+        if stanford_dir.exists():
+            for breed_dir in sorted(stanford_dir.iterdir()):
+                if breed_dir.is_dir():
+                    breed_name = stanford_breed_name(breed_dir.name)
+                    if breed_name in BREEDS["dog"]:
+                        sources.append(
+                            ([str(breed_dir / "*.jpg")], f"dog_{breed_name}")
+                        )
+
+        oxford_dir = datasets_dir / "oxford-iiit-pet" / "images"
+        if oxford_dir.exists():
+            for breed_name in BREEDS["cat"]:
+                sources.append(
+                    ([str(oxford_dir / f"{breed_name}_*.jpg")], f"cat_{breed_name}")
+                )
+
+    elif source == "folders":
+        for animal_type, dataset_path in [
+            ("dog", DOG_DATASET_PATH),
+            ("cat", CAT_DATASET_PATH),
+        ]:
+            for breed_folder in sorted(os.listdir(dataset_path)):
+                breed_path = os.path.join(dataset_path, breed_folder)
+                if os.path.isdir(breed_path):
+                    patterns = [
+                        os.path.join(breed_path, f"*{ext}")
+                        for ext in (".png", ".jpg", ".jpeg")
+                    ]
+                    sources.append((patterns, f"{animal_type}_{breed_folder}"))
+
+    else:
+        raise ValueError(f"Unknown dataset source: {source}")
+
+    return sources
+
+
+def breed_source_roots(source="datasets"):
+    """Top-level folders of a dataset source, watched for added breeds"""
+    if source == "datasets":
+        return [
+            os.path.join("datasets", "Images"),
+            os.path.join("datasets", "oxford-iiit-pet", "images"),
         ]
+    return [DOG_DATASET_PATH, CAT_DATASET_PATH]
+
+
+def breed_dataset_index(source="datasets", rebuild=False, restat=False):
+    """Load the persisted breed image index, scanning the dataset only if stale.
+
+    The index maps each breed label to its files with size, mtime and image
+    dimensions. It is rebuilt when BREEDS changes or a breed folder gains or
+    loses files, which only costs a stat per directory. Images edited in
+    place are not noticed that way: restat=True stats every indexed file
+    and updates the changed ones, rebuild=True rescans everything. The
+    index is loaded once per process; later calls reuse it.
+    """
+    if source in LOADED_INDEXES and not (rebuild or restat):
+        return LOADED_INDEXES[source]
+
+    index_path = DATASET_INDEX_PATH.format(source=source)
+    key = {"source": source, "breeds": BREEDS}
+    index = None if rebuild else load_dataset_index(index_path)
+    if index is not None and index_is_current(index, key):
+        if restat:
+            changed = refresh_file_stats(index)
+            if changed:
+                print(f"{changed} indexed images changed in place, updating the index")
+                save_dataset_index(index, index_path)
+        LOADED_INDEXES[source] = index
+        return index
+
+    print(f"Indexing {source} breed images...")
+    start = time.perf_counter()
+    files = []
+    directories = set(breed_source_roots(source))
+    for patterns, label in list_breed_sources(source):
+        for pattern in patterns:
+            directories.add(os.path.dirname(pattern))
+            files.extend((path, label) for path in sorted(glob.glob(pattern)))
+
+    index = build_dataset_index(files, key, sorted(directories))
+    save_dataset_index(index, index_path)
+    LOADED_INDEXES[source] = index
+    print(
+        f"Indexed {len(files)} images of {len(index['labels'])} breeds "
+        f"in {time.perf_counter() - start:.1f}s to {index_path}"
+    )
+    return index
+
+
+def dataset_fingerprint(source="datasets"):
+    """(path, size, mtime) of every training image, for the build manifest"""
+    return index_files(breed_dataset_index(source))
+
+
+def load_image(path, label):
+    """Decode and resize one image file to a uint8 IMAGE_SIZE tensor"""
+    image = tf.io.decode_image(
+        tf.io.read_file(path), channels=3, expand_animations=False
+    )
+    image = tf.image.resize(image, IMAGE_SIZE)
+    image = tf.cast(tf.clip_by_value(tf.round(image), 0, 255), tf.uint8)
+    image.set_shape((*IMAGE_SIZE, 3))
+    return image, label
+
+
+def create_streaming_datasets(source="datasets", cache_dir=None, seed=None):
+    """Create unbatched train/validation image datasets streamed from disk.
+
+    Only file paths are held in memory; images are decoded in parallel as the
+    trainer consumes them. With cache_dir set, decoded uint8 images are cached
+    on disk after the first epoch instead of being decoded again.
+    """
+    index = breed_dataset_index(source)
+    if not index["labels"]:
+        raise Exception("No valid breed images found in the datasets")
+
+    # Same ordering LabelEncoder would produce for the in-memory path
+    label_mapping = {i: label for i, label in enumerate(sorted(index["labels"]))}
+    label_to_index = {label: i for i, label in label_mapping.items()}
+
+    train_files, val_files = stratified_split(index, VALIDATION_SPLIT)
+    print(
+        f"Found {len(train_files) + len(val_files)} images for "
+        f"{len(label_mapping)} breeds"
+    )
+
+    datasets = {}
+    for split, split_files in [("train", train_files), ("val", val_files)]:
+        files = tf.data.Dataset.from_tensor_slices(
+            (
+                tf.constant([path for path, _ in split_files], dtype=tf.string),
+                tf.constant(
+                    [label_to_index[label] for _, label in split_files],
+                    dtype=tf.int32,
+                ),
+            )
+        )
+        if split == "train":
+            files = files.shuffle(
+                len(split_files), seed=seed, reshuffle_each_iteration=True
+            )
+
+        images = files.map(load_image, num_parallel_calls=tf.data.AUTOTUNE)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            images = images.cache(os.path.join(cache_dir, f"breed_{source}_{split}"))
+            if split == "train":
+                images = images.shuffle(SHUFFLE_BUFFER_SIZE, seed=seed)
+        datasets[split] = images
+
+    return datasets["train"], datasets["val"], label_mapping
+
+
+def read_image_uint8(image_path):
+    """Read an image with OpenCV as an RGB uint8 array of IMAGE_SIZE"""
+    img = cv2.imread(image_path)
+    if img is None:
+        raise ValueError(f"Could not decode image {image_path}")
+    img = cv2.resize(img, IMAGE_SIZE)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+
+def build_image_cache(cache_dir, source="datasets", shard_size=IMAGE_CACHE_SHARD_SIZE):
+    """Build or refresh the preprocessed image shard cache.
+
+    Images are resized once and stored as fixed-size uint8 .npy shards with a
+    manifest recording each file's source path, mtime, label and shard slot.
+    On later runs files whose path and mtime are unchanged are copied from
+    the existing shards; only new or modified files are decoded again.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+
+    files = [
+        (os.path.abspath(image_path), label, mtime)
+        for image_path, label, _, mtime in index_files(breed_dataset_index(source))
+    ]
+
+    if not files:
+        raise Exception("No valid breed images found in the datasets")
+
+    old_manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r") as f:
+            old_manifest = json.load(f)
+        if old_manifest["image_size"] != list(IMAGE_SIZE):
+            print("Image size changed, rebuilding image cache from scratch")
+            old_manifest = None
+
+    old_entries = {}
+    if old_manifest:
+        old_entries = {entry["path"]: entry for entry in old_manifest["entries"]}
+        up_to_date = old_manifest["shard_size"] == shard_size and len(
+            old_entries
+        ) == len(files)
+        for image_path, label, mtime in files:
+            entry = old_entries.get(image_path)
+            if entry is None or entry["mtime"] != mtime or entry["label"] != label:
+                up_to_date = False
+                break
+        if up_to_date:
+            print(f"Image cache is up to date ({len(files)} images)")
+            return old_manifest
+
+    # New shards get a fresh generation number so the old ones stay readable
+    # until the new manifest has replaced the old one
+    generation = old_manifest["generation"] + 1 if old_manifest else 0
+    old_shards = {}
+    entries = []
+    reused = 0
+    decoded = 0
+
+    for shard_index, start in enumerate(range(0, len(files), shard_size)):
+        chunk = files[start : start + shard_size]
+        shard_name = f"shard_{generation:03d}_{shard_index:05d}.npy"
+        shard = np.lib.format.open_memmap(
+            os.path.join(cache_dir, shard_name),
+            mode="w+",
+            dtype=np.uint8,
+            shape=(len(chunk), *IMAGE_SIZE, 3),
+        )
+
+        for offset, (image_path, label, mtime) in enumerate(chunk):
+            old_entry = old_entries.get(image_path)
+            try:
+                if old_entry is not None and old_entry["mtime"] == mtime:
+                    if old_entry["shard"] not in old_shards:
+                        old_shards[old_entry["shard"]] = np.load(
+                            os.path.join(cache_dir, old_entry["shard"]),
+                            mmap_mode="r",
+                        )
+                    shard[offset] = old_shards[old_entry["shard"]][old_entry["index"]]
+                    reused += 1
+                else:
+                    shard[offset] = read_image_uint8(image_path)
+                    decoded += 1
+            except Exception as e:
+                print(f"Error processing {image_path}: {e}")
+                continue
+
+            entries.append(
+                {
+                    "path": image_path,
+                    "mtime": mtime,
+                    "label": label,
+                    "shard": shard_name,
+                    "index": offset,
+                }
+            )
+
+        shard.flush()
+        del shard
+
+    manifest = {
+        "generation": generation,
+        "image_size": list(IMAGE_SIZE),
+        "shard_size": shard_size,
+        "source": source,
+        "entries": entries,
+    }
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    # Drop shards from older generations
+    old_shards.clear()
+    for shard_path in glob.glob(os.path.join(cache_dir, "shard_*.npy")):
+        if not os.path.basename(shard_path).startswith(f"shard_{generation:03d}_"):
+            os.remove(shard_path)
+
+    print(
+        f"Image cache built: {len(entries)} images, "
+        f"{decoded} decoded, {reused} reused from previous shards"
     )
+    return manifest
 
-    # Load and preprocess data
-    train_data, train_labels, val_data, val_labels = create_dataset()
 
-    # Create label encoder
-    label_encoder = LabelEncoder()
-    train_labels_encoded = label_encoder.fit_transform(train_labels)
-    val_labels_encoded = label_encoder.transform(val_labels)
+def create_cached_datasets(cache_dir, seed=None):
+    """Create unbatched train/validation datasets over the image shard cache.
 
-    # Save label mapping
-    label_mapping = {i: label for i, label in enumerate(label_encoder.classes_)}
+    Shards are memory-mapped, so no image is decoded and only the pages
+    touched by the current batch are resident.
+    """
+    with open(os.path.join(cache_dir, "manifest.json"), "r") as f:
+        manifest = json.load(f)
+
+    entries = manifest["entries"]
+    shards = {
+        shard_name: np.load(os.path.join(cache_dir, shard_name), mmap_mode="r")
+        for shard_name in sorted({entry["shard"] for entry in entries})
+    }
+
+    label_mapping = {
+        i: label for i, label in enumerate(sorted({e["label"] for e in entries}))
+    }
+    label_to_index = {label: i for i, label in label_mapping.items()}
+
+    _, val_files = stratified_split(
+        breed_dataset_index(manifest["source"]), VALIDATION_SPLIT
+    )
+    val_paths = {os.path.abspath(path) for path, _ in val_files}
+    val_mask = [entry["path"] in val_paths for entry in entries]
+    rng = np.random.default_rng(seed)
+
+    def make_dataset(split_entries, shuffle):
+        def generator():
+            order = (
+                rng.permutation(len(split_entries))
+                if shuffle
+                else range(len(split_entries))
+            )
+            for i in order:
+                entry = split_entries[i]
+                yield shards[entry["shard"]][entry["index"]], label_to_index[
+                    entry["label"]
+                ]
+
+        return tf.data.Dataset.from_generator(
+            generator,
+            output_signature=(
+                tf.TensorSpec(shape=(*IMAGE_SIZE, 3), dtype=tf.uint8),
+                tf.TensorSpec(shape=(), dtype=tf.int32),
+            ),
+        )
+
+    train_entries = [entry for entry, val in zip(entries, val_mask) if not val]
+    val_entries = [entry for entry, val in zip(entries, val_mask) if val]
+    print(
+        f"Loaded image cache: {len(train_entries)} train / "
+        f"{len(val_entries)} validation images"
+    )
+
+    return (
+        make_dataset(train_entries, shuffle=True),
+        make_dataset(val_entries, shuffle=False),
+        label_mapping,
+    )
+
+
+def augment_batch(images, seed, value_range=(0.0, 255.0)):
+    """Randomly flip, rotate, zoom and change brightness/contrast of a batch.
+
+    Only stateless random ops are used, so the result depends on nothing
+    but seed (a shape [2] integer tensor), even under a parallel map.
+    """
+    images = tf.cast(images, tf.float32)
+    batch_size = tf.shape(images)[0]
+    height = tf.cast(tf.shape(images)[1], tf.float32)
+    width = tf.cast(tf.shape(images)[2], tf.float32)
+    seeds = tf.random.experimental.stateless_split(seed, 5)
+    low, high = value_range
+
+    flip = tf.random.stateless_uniform([batch_size], seeds[0]) < 0.5
+    images = tf.where(flip[:, None, None, None], tf.reverse(images, axis=[2]), images)
+
+    # Rotation and zoom about the image centre as one projective transform
+    angles = (
+        tf.random.stateless_uniform(
+            [batch_size], seeds[1], -ROTATION_FACTOR, ROTATION_FACTOR
+        )
+        * 2
+        * np.pi
+    )
+    zoom = 1.0 + tf.random.stateless_uniform(
+        [batch_size], seeds[2], -ZOOM_FACTOR, ZOOM_FACTOR
+    )
+    cos = tf.cos(angles) * zoom
+    sin = tf.sin(angles) * zoom
+    cx = (width - 1) / 2
+    cy = (height - 1) / 2
+    zeros = tf.zeros([batch_size])
+    transforms = tf.stack(
+        [cos, -sin, cx - cos * cx + sin * cy, sin, cos, cy - sin * cx - cos * cy]
+        + [zeros, zeros],
+        axis=1,
+    )
+    images = tf.raw_ops.ImageProjectiveTransformV3(
+        images=images,
+        transforms=transforms,
+        output_shape=tf.shape(images)[1:3],
+        fill_value=0.0,
+        interpolation="BILINEAR",
+        fill_mode="REFLECT",
+    )
+
+    brightness = tf.random.stateless_uniform(
+        [batch_size, 1, 1, 1], seeds[3], -BRIGHTNESS_FACTOR, BRIGHTNESS_FACTOR
+    )
+    images = images + brightness * (high - low)
+
+    contrast = tf.random.stateless_uniform(
+        [batch_size, 1, 1, 1], seeds[4], 1 - CONTRAST_FACTOR, 1 + CONTRAST_FACTOR
+    )
+    mean = tf.reduce_mean(images, axis=[1, 2], keepdims=True)
+    images = (images - mean) * contrast + mean
+
+    return tf.clip_by_value(images, low, high)
+
+
+def augment_dataset(batches, seed=None, value_range=(0.0, 255.0)):
+    """Augment every (images, labels) batch with its own reproducible seed.
+
+    Seeds come from a random stream that is re-drawn each epoch, so every
+    epoch sees different augmentations, and the same ones for a given seed.
+    """
+    seeds = tf.data.Dataset.random(seed=seed, rerandomize_each_iteration=True).batch(2)
+    return tf.data.Dataset.zip((batches, seeds)).map(
+        lambda batch, batch_seed: (
+            augment_batch(batch[0], batch_seed, value_range),
+            batch[1],
+        ),
+        num_parallel_calls=tf.data.AUTOTUNE,
+    )
+
+
+def batch_dataset(images, batch_size, source="datasets", augment=False, seed=None):
+    """Batch, optionally augment and normalize a uint8 image dataset"""
+
+    def preprocess(batch, labels):
+        batch = tf.cast(batch, tf.float32)
+        if source == "datasets":
+            batch = tf.keras.applications.mobilenet_v2.preprocess_input(batch)
+        else:
+            batch = batch / 255.0
+        return batch, labels
+
+    batches = images.batch(batch_size)
+    if augment:
+        batches = augment_dataset(batches, seed)
+    return batches.map(preprocess, num_parallel_calls=tf.data.AUTOTUNE).prefetch(
+        tf.data.AUTOTUNE
+    )
+
+
+def array_dataset(data, labels, batch_size, augment=False, seed=None):
+    """Shuffled, optionally augmented batches gathered from in-memory arrays.
+
+    Batches are gathered by index, so the arrays are never copied as a whole.
+    data is mobilenet_v2-preprocessed, i.e. in [-1, 1].
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+
+    def gather(indices):
+        indices = np.sort(indices)
+        return data[indices].astype(np.float32), labels[indices]
+
+    def load(indices):
+        batch, batch_labels = tf.numpy_function(
+            gather, [indices], (tf.float32, tf.int64)
+        )
+        batch.set_shape([None, *data.shape[1:]])
+        batch_labels.set_shape([None])
+        return batch, batch_labels
+
+    batches = (
+        tf.data.Dataset.range(len(data))
+        .shuffle(len(data), seed=seed, reshuffle_each_iteration=True)
+        .batch(batch_size)
+        .map(load, num_parallel_calls=tf.data.AUTOTUNE)
+    )
+    if augment:
+        batches = augment_dataset(batches, seed, value_range=(-1.0, 1.0))
+    return batches.prefetch(tf.data.AUTOTUNE)
+
+
+def pipeline_images_per_sec(dataset, num_batches=20):
+    """Throughput of an input pipeline on its own, without a model"""
+    images = 0
+    start = time.perf_counter()
+    for batch, _ in dataset.take(num_batches):
+        images += int(tf.shape(batch)[0])
+    return images / (time.perf_counter() - start)
+
+
+def convert_model(model):
+    """Convert a trained Keras model to the float TFLite model the app loads"""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float32]
+
+    # Add metadata about input requirements
+    converter.target_spec.supported_ops = [
+        tf.lite.OpsSet.TFLITE_BUILTINS,
+        tf.lite.OpsSet.SELECT_TF_OPS,
+    ]
+    return converter.convert()
+
+
+def distill_students(
+    teacher,
+    teacher_tflite,
+    candidates,
+    fit_data,
+    metadata,
+    profiler,
+    run_label="",
+    temperature=DEFAULT_TEMPERATURE,
+    epochs=20,
+    latency_budget_ms=None,
+):
+    """Distill the trained teacher into each (alpha, image_size) MobileNetV2.
+
+    Every student is exported next to the teacher as
+    breed_model_student_a<alpha>_<size>.tflite with its own bundle, since
+    its input size differs. Returns the metadata entry comparing accuracy,
+    CPU latency and size of the teacher and each student, the files
+    written and, with latency_budget_ms set, the (row, Keras model, TFLite
+    model) of the most accurate candidate, teacher included, that fits it.
+    """
+    num_classes = len(metadata["label_mapping"])
+    teacher_row = {
+        "model": "breed_model.tflite",
+        "input_size": IMAGE_SIZE[0],
+        "accuracy": evaluate_accuracy(teacher, fit_data(32)["validation_data"]),
+        "latency_ms": measure_latency(teacher_tflite),
+        "size_bytes": len(teacher_tflite),
+    }
+
+    rows = []
+    outputs = []
+    # Only the best candidate so far is kept, not every student
+    best = (teacher_row, teacher, teacher_tflite)
+    for alpha, image_size in candidates:
+        name = student_name("breed_model", alpha, image_size)
+        print(f"Distilling into {name}...")
+        student = create_student(num_classes, alpha, image_size)
+        with profiler.span(f"distill_{alpha}_{image_size}"):
+            accuracy = distill(
+                teacher,
+                student,
+                fit_data(32),
+                epochs=epochs,
+                temperature=temperature,
+                callbacks=profiler.callbacks(name, 32, run_label),
+            )
+        if tf.keras.mixed_precision.global_policy().name != "float32":
+            student = float32_copy(
+                lambda: create_student(num_classes, alpha, image_size, weights=None),
+                student,
+            )
+
+        tflite_model = convert_model(student)
+        with open(os.path.join(MODEL_DIR, name + ".tflite"), "wb") as f:
+            f.write(tflite_model)
+        write_bundle(
+            os.path.join(MODEL_DIR, name + BUNDLE_EXTENSION),
+            label_list(metadata["label_mapping"]),
+            groups=BREEDS,
+            input_shape=[image_size, image_size, 3],
+            output_shape=[num_classes],
+            attributes={
+                **{key: str(value) for key, value in metadata["preprocessing"].items()},
+                "resized_size": str(image_size),
+                "teacher": "breed_model.tflite",
+            },
+        )
+        outputs += [name + ".tflite", name + BUNDLE_EXTENSION]
+        row = {
+            "model": name + ".tflite",
+            "alpha": alpha,
+            "input_size": image_size,
+            "accuracy": accuracy,
+            "latency_ms": measure_latency(tflite_model),
+            "size_bytes": len(tflite_model),
+        }
+        rows.append(row)
+        if latency_budget_ms is not None and budget_key(
+            row, latency_budget_ms
+        ) > budget_key(best[0], latency_budget_ms):
+            best = (row, student, tflite_model)
+
+    print_tradeoff(teacher_row, rows)
+    entry = {
+        "temperature": temperature,
+        "hard_label_weight": DEFAULT_HARD_LABEL_WEIGHT,
+        "teacher": teacher_row,
+        "students": rows,
+    }
+    if latency_budget_ms is None:
+        return entry, outputs, None
+    print_sweep([teacher_row, *rows], best[0], latency_budget_ms)
+    return entry, outputs, best
+
+
+def train_model(
+    streaming=False,
+    source="datasets",
+    cache_dir=None,
+    image_cache_dir=None,
+    int8=False,
+    force=False,
+    feature_cache_dir=None,
+    augment=True,
+    seed=None,
+    mixed_precision=False,
+    jit_compile=False,
+    profile=False,
+    trace_steps=None,
+    students=None,
+    temperature=DEFAULT_TEMPERATURE,
+    latency_budget_ms=None,
+    sparsity_levels=None,
+    num_clusters=None,
+):
+    """Train the model with improved training process.
+
+    With streaming=True images are read through a tf.data pipeline rather
+    than stacked into NumPy arrays, so memory stays bounded by the batch and
+    prefetch sizes instead of the dataset size. With image_cache_dir set,
+    the pipeline reads from the preprocessed shard cache instead, refreshing
+    it first for any new or modified files. With int8=True a full-integer
+    model with uint8 input/output is exported as well, calibrated on
+    training images. Returns None without training when the build manifest
+    shows the model was built from the same inputs, unless force=True. With
+    feature_cache_dir set, phase 1 trains the head on cached embeddings of
+    the frozen EfficientNetB0 (without augmentation); phase 2 fine-tuning
+    still runs on the full model. Augmentation runs per batch inside the
+    input pipeline and is reproducible for a given seed. mixed_precision
+    trains in bfloat16 where the CPU supports it and jit_compile compiles
+    the train step with XLA; per-epoch step times are logged either way.
+    profile=True (or a (start, stop) trace_steps window for tf.profiler)
+    appends a per-phase timing report to breed_model_profile.json. With
+    students, a list of (alpha, image_size) MobileNetV2 candidates, the
+    trained EfficientNet model is then used as a teacher and distilled
+    into each candidate, exported alongside it (see distill_students).
+    With latency_budget_ms set as well, the most accurate of the teacher
+    and the students whose TFLite CPU latency fits the budget becomes
+    breed_model.tflite, and its input size goes into the metadata; a
+    replaced teacher is kept as breed_model_teacher.tflite. With
+    sparsity_levels, pruned copies of the exported model (clustered to
+    num_clusters values per kernel if set) are fine-tuned and written next
+    to it, and their size, load time and accuracy are compared in the
+    metadata (see compression.compress_model).
+    """
+    # The in-memory path always reads the Stanford/Oxford layout
+    dataset_source = source if (streaming or image_cache_dir) else "datasets"
+    inputs_hash = hash_inputs(
+        {
+            "breeds": BREEDS,
+            "image_size": IMAGE_SIZE,
+            "streaming": bool(streaming or image_cache_dir),
+            "source": dataset_source,
+            "int8": int8,
+            "feature_cache": bool(feature_cache_dir),
+            "augment": augment,
+            "seed": seed,
+            "mixed_precision": mixed_precision,
+            "jit_compile": jit_compile,
+            "students": students,
+            "temperature": temperature if students else None,
+            "latency_budget_ms": latency_budget_ms if students else None,
+            "sparsity_levels": sparsity_levels,
+            "num_clusters": num_clusters if sparsity_levels else None,
+            "dataset": dataset_fingerprint(dataset_source),
+        },
+        files=source_files(__file__),
+    )
+    if not force and is_up_to_date(MODEL_DIR, "breed_model", inputs_hash):
+        print("breed_model is up to date, skipping training")
+        return None
+
+    print("Starting model training...")
+    profiler = Profiler("breed_model", trace_steps=trace_steps)
+    policy = set_precision(mixed_precision)
+    run_label = f"{policy}, XLA" if jit_compile else policy
+
+    if streaming or image_cache_dir:
+        with profiler.span("load_data"):
+            if image_cache_dir:
+                build_image_cache(image_cache_dir, source=source)
+                train_images, val_images, label_mapping = create_cached_datasets(
+                    image_cache_dir, seed=seed
+                )
+            else:
+                train_images, val_images, label_mapping = create_streaming_datasets(
+                    source=source, cache_dir=cache_dir, seed=seed
+                )
+
+        def fit_data(batch_size):
+            return {
+                "x": batch_dataset(
+                    train_images, batch_size, source, augment=augment, seed=seed
+                ),
+                "validation_data": batch_dataset(val_images, batch_size, source),
+            }
+
+        def feature_batches():
+            return (
+                batch_dataset(train_images, 64, source).as_numpy_iterator(),
+                batch_dataset(val_images, 64, source).as_numpy_iterator(),
+            )
+
+    else:
+        # Load and preprocess data
+        with profiler.span("load_data"):
+            train_data, train_labels, val_data, val_labels = create_dataset()
+
+        # Create label encoder
+        label_encoder = LabelEncoder()
+        train_labels_encoded = label_encoder.fit_transform(train_labels)
+        val_labels_encoded = label_encoder.transform(val_labels)
+
+        # Save label mapping
+        label_mapping = {i: label for i, label in enumerate(label_encoder.classes_)}
+
+        def fit_data(batch_size):
+            return {
+                "x": array_dataset(
+                    train_data,
+                    train_labels_encoded,
+                    batch_size,
+                    augment=augment,
+                    seed=seed,
+                ),
+                "validation_data": (val_data, val_labels_encoded),
+            }
+
+        def feature_batches():
+            return (
+                array_batches(train_data, train_labels_encoded),
+                array_batches(val_data, val_labels_encoded),
+            )
 
     # Create model
-    model, base_model = create_model(len(label_mapping))
+    model, base_model = create_model(len(label_mapping), jit_compile=jit_compile)
 
     # First phase: Train with frozen base model
     print("Phase 1: Training top layers...")
-    history1 = model.fit(
-        data_augmentation(train_data),
-        train_labels_encoded,
-        validation_data=(val_data, val_labels_encoded),
-        epochs=20,
-        batch_size=32,
-        callbacks=[
-            tf.keras.callbacks.EarlyStopping(
-                monitor="val_accuracy", patience=5, restore_best_weights=True
+    phase1_callbacks = profiler.callbacks("phase1", 32, run_label)
+    phase1_timer = phase1_callbacks[0]
+    callbacks = [
+        tf.keras.callbacks.EarlyStopping(
+            monitor="val_accuracy", patience=5, restore_best_weights=True
+        ),
+        *phase1_callbacks,
+    ]
+    if feature_cache_dir:
+        # The backbone is frozen, so its pooled output never changes
+        extractor = create_feature_extractor(base_model)
+        backbone_key = f"{base_model.name}_imagenet_{IMAGE_SIZE[0]}"
+        train_batches, val_batches = feature_batches()
+        with profiler.span("feature_cache"):
+            train_features, train_labels = cached_embeddings(
+                extractor, train_batches, feature_cache_dir, backbone_key
             )
-        ],
-    )
+            val_features, val_labels = cached_embeddings(
+                extractor, val_batches, feature_cache_dir, backbone_key
+            )
+        with profiler.span("phase1"):
+            history1 = fit_head(
+                model,
+                train_features,
+                train_labels,
+                val_features,
+                val_labels,
+                batch_size=32,
+                epochs=20,
+                callbacks=callbacks,
+            )
+    else:
+        phase1_data = fit_data(32)
+        print(
+            f"Input pipeline: {pipeline_images_per_sec(phase1_data['x']):.1f} "
+            "images/sec"
+        )
+        with profiler.span("phase1"):
+            history1 = model.fit(**phase1_data, epochs=20, callbacks=callbacks)
 
     # Second phase: Fine-tune the base model
     print("Phase 2: Fine-tuning EfficientNet layers...")
@@ -445,50 +1226,149 @@ def train_model():
         optimizer=tf.keras.optimizers.Adam(learning_rate=0.00001),
         loss="sparse_categorical_crossentropy",
         metrics=["accuracy"],
+        jit_compile=jit_compile,
     )
 
     # Train again
-    history2 = model.fit(
-        data_augmentation(train_data),
-        train_labels_encoded,
-        validation_data=(val_data, val_labels_encoded),
-        epochs=10,
-        batch_size=16,
-        callbacks=[
-            tf.keras.callbacks.EarlyStopping(
-                monitor="val_accuracy", patience=3, restore_best_weights=True
-            )
-        ],
-    )
+    phase2_callbacks = profiler.callbacks("phase2", 16, run_label)
+    phase2_timer = phase2_callbacks[0]
+    with profiler.span("phase2"):
+        history2 = model.fit(
+            **fit_data(16),
+            epochs=10,
+            callbacks=[
+                tf.keras.callbacks.EarlyStopping(
+                    monitor="val_accuracy", patience=3, restore_best_weights=True
+                ),
+                *phase2_callbacks,
+            ],
+        )
+
+    if policy != "float32":
+        model = float32_copy(lambda: create_model(len(label_mapping))[0], model)
 
     # Convert to TFLite with better quantization
     print("Converting to TFLite format...")
-    converter = tf.lite.TFLiteConverter.from_keras_model(model)
-    converter.optimizations = [tf.lite.Optimize.DEFAULT]
-    converter.target_spec.supported_types = [tf.float32]
-
-    # Add metadata about input requirements
-    converter.target_spec.supported_ops = [
-        tf.lite.OpsSet.TFLITE_BUILTINS,
-        tf.lite.OpsSet.SELECT_TF_OPS,
-    ]
-
-    tflite_model = converter.convert()
-
-    # Save the model and metadata
-    model_path = os.path.join(MODEL_DIR, "breed_model.tflite")
-    with open(model_path, "wb") as f:
-        f.write(tflite_model)
+    with profiler.span("convert"):
+        tflite_model = convert_model(model)
 
     metadata = {
         "breeds": BREEDS,
         "label_mapping": label_mapping,
         "input_shape": [224, 224, 3],
         "preprocessing": {"rescale": "1./255", "resized_size": 224},
+        "training": {
+            "precision": policy,
+            "jit_compile": jit_compile,
+            "step_time_ms": {
+                "phase1": phase1_timer.epoch_step_times,
+                "phase2": phase2_timer.epoch_step_times,
+            },
+            "images_per_sec": {
+                "phase1": phase1_timer.epoch_samples_per_sec,
+                "phase2": phase2_timer.epoch_samples_per_sec,
+            },
+        },
     }
 
+    extra_outputs = []
+    if students:
+        metadata["distillation"], extra_outputs, chosen = distill_students(
+            model,
+            tflite_model,
+            students,
+            fit_data,
+            metadata,
+            profiler,
+            run_label,
+            temperature=temperature,
+            latency_budget_ms=latency_budget_ms,
+        )
+        if chosen and chosen[1] is not model:
+            # A student fits the budget better; the app loads it instead
+            print(f"Exporting {chosen[0]['model']} as breed_model.tflite")
+            with open(os.path.join(MODEL_DIR, "breed_model_teacher.tflite"), "wb") as f:
+                f.write(tflite_model)
+            metadata["distillation"]["teacher"]["model"] = "breed_model_teacher.tflite"
+            extra_outputs.append("breed_model_teacher.tflite")
+            _, model, tflite_model = chosen
+            image_size = chosen[0]["input_size"]
+            metadata["input_shape"] = [image_size, image_size, 3]
+            metadata["preprocessing"]["resized_size"] = image_size
+        if chosen:
+            metadata["sweep"] = sweep_metadata(
+                [
+                    metadata["distillation"]["teacher"],
+                    *metadata["distillation"]["students"],
+                ],
+                chosen[0],
+                latency_budget_ms,
+            )
+
+    # Save the model and metadata
+    model_path = os.path.join(MODEL_DIR, "breed_model.tflite")
+    with profiler.span("write_model"):
+        with open(model_path, "wb") as f:
+            f.write(tflite_model)
+
+    if int8:
+        image_size = metadata["input_shape"][0]
+        if streaming or image_cache_dir:
+            representative = (
+                tf.image.resize(images[0], (image_size, image_size))
+                for images, _ in batch_dataset(train_images, 1, source).take(
+                    NUM_REPRESENTATIVE_SAMPLES
+                )
+            )
+        else:
+            representative = tf.image.resize(
+                train_data[:NUM_REPRESENTATIVE_SAMPLES], (image_size, image_size)
+            )
+        with profiler.span("int8_export"):
+            metadata["int8"] = save_int8_model(
+                model, representative, MODEL_DIR, "breed_model", tflite_model
+            )
+
+    if sparsity_levels:
+        metadata["compression"], compressed_outputs = compress_model(
+            model,
+            tflite_model,
+            fit_data(16),
+            convert_model,
+            MODEL_DIR,
+            "breed_model",
+            sparsity_levels,
+            num_clusters,
+            callbacks=lambda phase: profiler.callbacks(phase, 16, run_label),
+            span=profiler.span,
+        )
+        extra_outputs += compressed_outputs
+
     with open(os.path.join(MODEL_DIR, "breed_metadata.json"), "w") as f:
         json.dump(metadata, f, indent=2)
+    write_bundle(
+        os.path.join(MODEL_DIR, "breed_model" + BUNDLE_EXTENSION),
+        label_list(label_mapping),
+        groups=BREEDS,
+        input_shape=metadata["input_shape"],
+        output_shape=[len(label_mapping)],
+        quantization=metadata.get("int8"),
+        attributes={
+            key: str(value) for key, value in metadata["preprocessing"].items()
+        },
+    )
+
+    outputs = [
+        "breed_model.tflite",
+        "breed_metadata.json",
+        "breed_model" + BUNDLE_EXTENSION,
+    ]
+    if int8:
+        outputs.append("breed_model_int8.tflite")
+    outputs += extra_outputs
+    record_build(MODEL_DIR, "breed_model", inputs_hash, outputs)
+    if profile or trace_steps:
+        profiler.save(MODEL_DIR)
 
     print(f"Model saved to {model_path}")
     return history1, history2
@@ -560,9 +1440,174 @@ def load_and_preprocess_dataset():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the breed model")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Stream images through tf.data instead of loading them into RAM",
+    )
+    parser.add_argument(
+        "--source",
+        choices=["datasets", "folders"],
+        default="datasets",
+        help="Stanford/Oxford layout or per-breed folders under DATASET_ROOT",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Cache decoded images on disk here (streaming mode only)",
+    )
+    parser.add_argument(
+        "--image-cache-dir",
+        default=None,
+        help="Train from memory-mapped preprocessed image shards kept here",
+    )
+    parser.add_argument(
+        "--int8",
+        action="store_true",
+        help="Also export a full-integer model with uint8 input/output",
+    )
+    parser.add_argument(
+        "--feature-cache-dir",
+        default=None,
+        help="Run phase 1 on frozen-backbone embeddings cached here",
+    )
+    parser.add_argument(
+        "--no-augment",
+        action="store_true",
+        help="Train without per-batch augmentation",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for shuffling and augmentation, for reproducible runs",
+    )
+    parser.add_argument(
+        "--mixed-precision",
+        action="store_true",
+        help="Train in bfloat16 on CPUs with AVX512-BF16/AMX support",
+    )
+    parser.add_argument(
+        "--jit-compile",
+        action="store_true",
+        help="Compile the train step with XLA",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Append a per-phase timing report to breed_model_profile.json",
+    )
+    parser.add_argument(
+        "--trace-steps",
+        type=int,
+        nargs=2,
+        metavar=("START", "STOP"),
+        help="Capture a tf.profiler trace of these train steps",
+    )
+    parser.add_argument(
+        "--download",
+        action="store_true",
+        help="Fetch the Stanford Dogs / Oxford-IIIT archives into datasets/ first",
+    )
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Rescan the dataset instead of trusting the saved breed index",
+    )
+    parser.add_argument(
+        "--restat",
+        action="store_true",
+        help="Stat every indexed image to pick up images edited in place",
+    )
+    parser.add_argument(
+        "--distill",
+        nargs="*",
+        metavar="ALPHA:SIZE",
+        help="Distill the trained model into MobileNetV2 students at these "
+        "widths and input sizes (default: "
+        + " ".join(f"{alpha}:{size}" for alpha, size in DEFAULT_STUDENTS)
+        + ")",
+    )
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        default=DEFAULT_TEMPERATURE,
+        help="Softmax temperature of the distillation targets",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Distill MobileNetV2 students across input sizes and widths and "
+        "export the most accurate model within --latency-budget-ms",
+    )
+    parser.add_argument(
+        "--latency-budget-ms",
+        type=float,
+        default=None,
+        help="Largest median single-image TFLite latency the exported model "
+        f"may have, with --distill or --sweep (--sweep default: "
+        f"{DEFAULT_LATENCY_BUDGET_MS})",
+    )
+    parser.add_argument(
+        "--prune",
+        type=float,
+        nargs="+",
+        metavar="SPARSITY",
+        help="Also export pruned variants fine-tuned to these sparsities, "
+        "e.g. 0.5 0.75",
+    )
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=None,
+        help="Cluster the pruned kernels to this many shared values each",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Retrain even if the build manifest says the model is up to date",
+    )
+    args = parser.parse_args()
+
+    if args.download:
+        download_and_extract_dataset()
+    if args.reindex or args.restat:
+        breed_dataset_index(args.source, rebuild=args.reindex, restat=args.restat)
+
+    students = None
+    latency_budget_ms = args.latency_budget_ms
+    if args.sweep:
+        students = sweep_candidates()
+        if latency_budget_ms is None:
+            latency_budget_ms = DEFAULT_LATENCY_BUDGET_MS
+    elif args.distill is not None:
+        students = parse_students(args.distill) or DEFAULT_STUDENTS
+
     print("=== Starting Breed Model Training with Real Data (Dogs and Cats) ===")
     try:
-        history = train_model()
+        history = train_model(
+            streaming=args.streaming,
+            source=args.source,
+            cache_dir=args.cache_dir,
+            image_cache_dir=args.image_cache_dir,
+            int8=args.int8,
+            force=args.force,
+            feature_cache_dir=args.feature_cache_dir,
+            augment=not args.no_augment,
+            seed=args.seed,
+            mixed_precision=args.mixed_precision,
+            jit_compile=args.jit_compile,
+            profile=args.profile,
+            trace_steps=args.trace_steps,
+            students=students,
+            temperature=args.temperature,
+            latency_budget_ms=latency_budget_ms,
+            sparsity_levels=args.prune,
+            num_clusters=args.clusters,
+        )
+        if history is None:
+            sys.exit(0)
         print("\nTraining completed successfully!")
         print("\nModel performance metrics:")
         print(f"Final training accuracy: {history[0].history['accuracy'][-1]:.2f}")
@@ -1,12 +1,35 @@
 import tensorflow as tf
 import numpy as np
+import argparse
 import os
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from tensorflow.keras.applications import MobileNetV2
 import cv2
 from PIL import Image, ImageDraw, ImageEnhance, ImageFilter
 import sys
+import time
+from feature_cache import (
+    array_batches,
+    cached_embeddings,
+    create_feature_extractor,
+    fit_head,
+)
+from build_manifest import hash_inputs, is_up_to_date, record_build, source_files
+from tflite_utils import NUM_REPRESENTATIVE_SAMPLES, measure_latency, save_int8_model
+from training_utils import float32_copy, set_precision
+from profiling import Profiler
+from model_bundle import BUNDLE_EXTENSION, label_list, write_bundle
+from compression import compress_model
+from model_sweep import (
+    DEFAULT_LATENCY_BUDGET_MS,
+    budget_key,
+    print_sweep,
+    sweep_candidates,
+    sweep_metadata,
+    variant_name,
+)
 
 # Define skin diseases for each animal type
 SKIN_DISEASES = {
@@ -37,151 +60,391 @@ SKIN_DISEASES = {
 MODEL_DIR = os.path.join("..", "assets", "models")
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# Scratch .npy the parallel generator's workers write into; removed by
+# create_and_train_model once the train/validation split is in memory
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARALLEL_DATASET_PATH = os.path.join(SCRIPT_DIR, "datasets", "skin_dataset.npy")
 
-def create_base_skin_texture(size=(224, 224)):
+# Images generated per worker task; seeds are derived per image, so output
+# does not depend on how shards are distributed across workers
+GENERATION_SHARD_SIZE = 64
+
+# Side of the square synthetic images; models may be swept to smaller inputs
+IMAGE_SIZE = 224
+
+# Pattern types rendered with create_patterns_batched in batched generation;
+# OpenCV's per-image drawing is faster for the others' few large primitives
+# (see benchmark_pattern_rasterizer)
+BATCHED_PATTERN_TYPES = {"bumps"}
+
+
+def create_base_skin_texture(size=(224, 224), rng=np.random):
     """Create a base skin texture"""
-    texture = np.random.rand(*size) * 0.3 + 0.7  # Light colored base
+    texture = rng.rand(*size) * 0.3 + 0.7  # Light colored base
     texture = cv2.GaussianBlur(texture, (7, 7), 0)
     return texture
 
 
-def create_pattern(pattern_type, size=(224, 224)):
+def create_pattern(pattern_type, size=(224, 224), rng=np.random):
     """Create different disease patterns"""
     pattern = np.zeros(size)
 
     if pattern_type == "scaly":
         # Create scaly pattern with random polygons
         for _ in range(20):
-            x = np.random.randint(0, size[0])
-            y = np.random.randint(0, size[1])
-            points = np.random.randint(0, size[0], (6, 2))
+            x = rng.randint(0, size[0])
+            y = rng.randint(0, size[1])
+            points = rng.randint(0, size[0], (6, 2))
             cv2.fillPoly(pattern, [points], 1)
 
     elif pattern_type == "red_patches":
         # Create red, inflamed-looking patches
         for _ in range(5):
-            x = np.random.randint(0, size[0])
-            y = np.random.randint(0, size[1])
-            radius = np.random.randint(20, 50)
+            x = rng.randint(0, size[0])
+            y = rng.randint(0, size[1])
+            radius = rng.randint(20, 50)
             cv2.circle(pattern, (x, y), radius, 1, -1)
 
     elif pattern_type == "hair_loss":
         # Create patches of hair loss
         for _ in range(3):
-            x = np.random.randint(0, size[0])
-            y = np.random.randint(0, size[1])
-            axes = (np.random.randint(30, 70), np.random.randint(30, 70))
-            angle = np.random.randint(0, 360)
+            x = rng.randint(0, size[0])
+            y = rng.randint(0, size[1])
+            axes = (rng.randint(30, 70), rng.randint(30, 70))
+            angle = rng.randint(0, 360)
             cv2.ellipse(pattern, (x, y), axes, angle, 0, 360, 1, -1)
 
     elif pattern_type == "circular":
         # Create circular lesions (like ringworm)
         for _ in range(3):
-            x = np.random.randint(0, size[0])
-            y = np.random.randint(0, size[1])
-            radius = np.random.randint(30, 60)
+            x = rng.randint(0, size[0])
+            y = rng.randint(0, size[1])
+            radius = rng.randint(30, 60)
             cv2.circle(pattern, (x, y), radius, 1, 2)
 
     elif pattern_type == "bumps":
         # Create small bumps
         for _ in range(50):
-            x = np.random.randint(0, size[0])
-            y = np.random.randint(0, size[1])
-            radius = np.random.randint(2, 5)
+            x = rng.randint(0, size[0])
+            y = rng.randint(0, size[1])
+            radius = rng.randint(2, 5)
             cv2.circle(pattern, (x, y), radius, 1, -1)
 
     elif pattern_type == "inflammation":
         # Create diffuse inflammation
-        pattern = cv2.GaussianBlur(np.random.rand(*size), (15, 15), 0)
+        pattern = cv2.GaussianBlur(rng.rand(*size), (15, 15), 0)
         pattern = (pattern > 0.7).astype(np.float32)
 
     return pattern
 
 
-def generate_synthetic_image(disease, animal_type):
+def gaussian_blur_batched(images, ksize):
+    """cv2.GaussianBlur(image, (ksize, ksize), 0) applied to every image.
+
+    OpenCV's separable blur is already SIMD-vectorized per image and beats a
+    NumPy formulation over the batch, so this only loops the C call.
+    """
+    return np.stack([cv2.GaussianBlur(image, (ksize, ksize), 0) for image in images])
+
+
+def stamp_masks(pattern, x, y, inside):
+    """Set pattern pixels covered by per-primitive masks.
+
+    x and y are (B, N) primitive centers; inside is a (B, N, 2R+1, 2R+1) mask
+    evaluated on a local coordinate window centered on each primitive.
+    """
+    batch_size, height, width = pattern.shape
+    radius = inside.shape[-1] // 2
+    b, n, dy, dx = np.nonzero(inside)
+    px = x[b, n] + dx - radius
+    py = y[b, n] + dy - radius
+    on_image = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    flat = (b[on_image] * height + py[on_image]) * width + px[on_image]
+    pattern.reshape(-1)[flat] = 1
+
+
+def create_patterns_batched(pattern_type, batch_size, size=(224, 224), rng=np.random):
+    """Vectorized create_pattern for the types in BATCHED_PATTERN_TYPES.
+
+    Bumps are disc masks evaluated for every bump of every image at once on
+    a coordinate window around its center.
+    """
+    if pattern_type not in BATCHED_PATTERN_TYPES:
+        raise ValueError(f"No batched renderer for {pattern_type!r}")
+
+    pattern = np.zeros((batch_size, *size))
+    x = rng.randint(0, size[0], (batch_size, 50))
+    y = rng.randint(0, size[1], (batch_size, 50))
+    radius = rng.randint(2, 5, (batch_size, 50))[..., None, None]
+    offsets = np.arange(-4, 5, dtype=np.float32)
+    dist2 = offsets[np.newaxis, :] ** 2 + offsets[:, np.newaxis] ** 2
+    stamp_masks(pattern, x, y, dist2 <= radius**2)
+    return pattern
+
+
+def generate_synthetic_image(disease, animal_type, rng=np.random):
     """Generate a synthetic image for a specific skin disease"""
     # Create base texture
-    base = create_base_skin_texture()
+    base = create_base_skin_texture(rng=rng)
 
     # Create RGB image
     image = np.stack([base, base, base], axis=-1)
 
     # Add disease-specific patterns
     for pattern_type in disease["patterns"]:
-        pattern = create_pattern(pattern_type)
+        pattern = create_pattern(pattern_type, rng=rng)
 
         if pattern_type in ["red_patches", "inflammation"]:
             # Add redness
             image[:, :, 0] = np.maximum(image[:, :, 0], pattern * 0.8)  # Red channel
             image[:, :, 1:] = np.minimum(
-                image[:, :, 1:], 1 - pattern * 0.3
+                image[:, :, 1:], 1 - pattern[..., np.newaxis] * 0.3
             )  # Reduce green/blue
         elif pattern_type in ["scaly", "hair_loss"]:
             # Modify texture
-            image = image * (1 - pattern * 0.3)
+            image = image * (1 - pattern[..., np.newaxis] * 0.3)
         elif pattern_type == "circular":
             # Add ringworm-like patterns
-            image = image * (1 - pattern * 0.2)
+            image = image * (1 - pattern[..., np.newaxis] * 0.2)
             image[:, :, 0] = np.maximum(
                 image[:, :, 0], pattern * 0.6
             )  # Add redness to rings
 
     # Add noise and blur for realism
-    noise = np.random.normal(0, 0.05, image.shape)
+    noise = rng.normal(0, 0.05, image.shape)
     image = np.clip(image + noise, 0, 1)
     image = cv2.GaussianBlur(image, (3, 3), 0)
 
     return (image * 255).astype(np.uint8)
 
 
-def create_dataset(num_samples_per_class=100):
-    """Create synthetic dataset for training"""
-    X = []
-    y = []
-    label_mapping = {}
-    current_label = 0
+def generate_synthetic_images_batched(disease, animal_type, batch_size, rng=np.random):
+    """Batched generate_synthetic_image.
+
+    Pattern types in BATCHED_PATTERN_TYPES use create_patterns_batched; the
+    rest stay on per-image OpenCV drawing, which benchmark_pattern_rasterizer
+    shows is faster for a handful of large primitives.
+    """
+    size = (224, 224)
+    base = gaussian_blur_batched(rng.rand(batch_size, *size) * 0.3 + 0.7, 7)
+    image = np.stack([base, base, base], axis=-1)
+
+    for pattern_type in disease["patterns"]:
+        if pattern_type in BATCHED_PATTERN_TYPES:
+            pattern = create_patterns_batched(pattern_type, batch_size, size, rng=rng)
+        else:
+            pattern = np.stack(
+                [create_pattern(pattern_type, size, rng=rng) for _ in range(batch_size)]
+            )
 
-    for animal_type, diseases in SKIN_DISEASES.items():
-        for disease in diseases:
-            print(
-                f"Generating {num_samples_per_class} samples for {animal_type} - {disease['name']}"
+        if pattern_type in ["red_patches", "inflammation"]:
+            image[..., 0] = np.maximum(image[..., 0], pattern * 0.8)
+            image[..., 1:] = np.minimum(
+                image[..., 1:], 1 - pattern[..., np.newaxis] * 0.3
             )
-            label_mapping[current_label] = f"{animal_type}_{disease['name']}"
+        elif pattern_type in ["scaly", "hair_loss"]:
+            image = image * (1 - pattern[..., np.newaxis] * 0.3)
+        elif pattern_type == "circular":
+            image = image * (1 - pattern[..., np.newaxis] * 0.2)
+            image[..., 0] = np.maximum(image[..., 0], pattern * 0.6)
+
+    noise = rng.normal(0, 0.05, image.shape)
+    image = np.clip(image + noise, 0, 1)
+    image = gaussian_blur_batched(image, 3)
+
+    return (image * 255).astype(np.uint8)
+
+
+def benchmark_pattern_rasterizer(batch_size=64, repeats=3, seed=0):
+    """Compare per-image OpenCV create_pattern with create_patterns_batched"""
+    results = {}
+
+    print(f"\n{'pattern':<14}{'opencv ms/img':>15}{'batched ms/img':>16}{'speedup':>9}")
+    for pattern_type in sorted(BATCHED_PATTERN_TYPES):
+        rng = np.random.RandomState(seed)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            for _ in range(batch_size):
+                create_pattern(pattern_type, rng=rng)
+        opencv_ms = (time.perf_counter() - start) * 1000 / (repeats * batch_size)
+
+        rng = np.random.RandomState(seed)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            create_patterns_batched(pattern_type, batch_size, rng=rng)
+        batched_ms = (time.perf_counter() - start) * 1000 / (repeats * batch_size)
+
+        results[pattern_type] = {"opencv_ms": opencv_ms, "batched_ms": batched_ms}
+        print(
+            f"{pattern_type:<14}{opencv_ms:>15.3f}{batched_ms:>16.3f}"
+            f"{opencv_ms / batched_ms:>8.1f}x"
+        )
+
+    return results
 
-            for _ in range(num_samples_per_class):
-                image = generate_synthetic_image(disease, animal_type)
-                X.append(image)
-                y.append(current_label)
 
-            current_label += 1
+def list_diseases():
+    """List (animal type, disease) pairs in label order"""
+    return [
+        (animal_type, disease)
+        for animal_type, diseases in SKIN_DISEASES.items()
+        for disease in diseases
+    ]
 
-    # Save label mapping
+
+def save_label_mapping():
+    """Save the disease table and label mapping next to the model"""
+    label_mapping = {
+        label: f"{animal_type}_{disease['name']}"
+        for label, (animal_type, disease) in enumerate(list_diseases())
+    }
     with open(os.path.join(MODEL_DIR, "skin_disease_metadata.json"), "w") as f:
         json.dump(
             {"diseases": SKIN_DISEASES, "label_mapping": label_mapping}, f, indent=2
         )
+    return label_mapping
+
+
+def create_dataset(num_samples_per_class=100, batched=False, seed=0):
+    """Create synthetic dataset for training, drawn from RandomState(seed)"""
+    rng = np.random.RandomState(seed)
+    X = []
+    y = []
+
+    for current_label, (animal_type, disease) in enumerate(list_diseases()):
+        print(
+            f"Generating {num_samples_per_class} samples for {animal_type} - {disease['name']}"
+        )
+
+        if batched:
+            for start in range(0, num_samples_per_class, GENERATION_SHARD_SIZE):
+                count = min(GENERATION_SHARD_SIZE, num_samples_per_class - start)
+                X.extend(
+                    generate_synthetic_images_batched(
+                        disease, animal_type, count, rng=rng
+                    )
+                )
+                y.extend([current_label] * count)
+            continue
+
+        for _ in range(num_samples_per_class):
+            image = generate_synthetic_image(disease, animal_type, rng=rng)
+            X.append(image)
+            y.append(current_label)
+
+    save_label_mapping()
 
     return np.array(X), np.array(y)
 
 
-def create_and_train_model():
-    """Create and train the model"""
-    print("Generating synthetic dataset...")
-    X, y = create_dataset(num_samples_per_class=100)
+def generate_image_shard(output_path, label, start, stop, seed):
+    """Generate samples [start, stop) of one disease into the shared array.
+
+    Every image gets its own RandomState seeded from (seed, label, index), so
+    the result is identical no matter which worker renders it.
+    """
+    animal_type, disease = list_diseases()[label]
+    X = np.load(output_path, mmap_mode="r+")
+    num_samples_per_class = len(X) // len(list_diseases())
+    offset = label * num_samples_per_class
+
+    for index in range(start, stop):
+        rng = np.random.RandomState([seed, label, index])
+        X[offset + index] = generate_synthetic_image(disease, animal_type, rng=rng)
+
+    X.flush()
+    return stop - start
+
+
+def create_dataset_parallel(
+    num_samples_per_class=100,
+    num_workers=None,
+    seed=0,
+    output_path=PARALLEL_DATASET_PATH,
+    shard_size=GENERATION_SHARD_SIZE,
+):
+    """Create the synthetic dataset with a process pool.
+
+    (disease, sample range) shards are spread across workers, which write
+    their images straight into a preallocated .npy memmap at output_path
+    instead of pickling them back to the parent process. X is returned
+    memory-mapped from output_path; the caller removes the file when done.
+    """
+    diseases = list_diseases()
+    num_samples = len(diseases) * num_samples_per_class
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    X = np.lib.format.open_memmap(
+        output_path, mode="w+", dtype=np.uint8, shape=(num_samples, 224, 224, 3)
+    )
+    del X
+    y = np.repeat(np.arange(len(diseases)), num_samples_per_class)
+
+    shards = [
+        (output_path, label, start, min(start + shard_size, num_samples_per_class))
+        for label in range(len(diseases))
+        for start in range(0, num_samples_per_class, shard_size)
+    ]
+    print(
+        f"Generating {num_samples} samples in {len(shards)} shards "
+        f"with {num_workers or os.cpu_count()} workers"
+    )
 
-    # Split into training and validation sets
-    indices = np.random.permutation(len(X))
-    split_idx = int(len(X) * 0.8)
-    train_indices = indices[:split_idx]
-    val_indices = indices[split_idx:]
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [
+            executor.submit(generate_image_shard, *shard, seed) for shard in shards
+        ]
+        done = 0
+        for future in futures:
+            done += future.result()
+        print(f"Generated {done} samples")
+
+    save_label_mapping()
+
+    return np.load(output_path, mmap_mode="r"), y
+
+
+def create_synthetic_stream(seed, stream, batch_size, num_samples=None):
+    """Stream freshly generated images through a parallel tf.data pipeline.
+
+    Sample i is rendered from RandomState([seed, stream, i]) with label
+    i % num_classes, so batches are class-balanced and reproducible. With
+    num_samples=None the stream is infinite and every epoch sees new images.
+    """
+    diseases = list_diseases()
+
+    def generate(index):
+        label = int(index) % len(diseases)
+        animal_type, disease = diseases[label]
+        rng = np.random.RandomState([seed, stream, int(index)])
+        image = generate_synthetic_image(disease, animal_type, rng=rng)
+        return image, np.int32(label)
+
+    def load(index):
+        image, label = tf.numpy_function(generate, [index], [tf.uint8, tf.int32])
+        image.set_shape((224, 224, 3))
+        label.set_shape(())
+        return image, label
+
+    if num_samples is None:
+        indices = tf.data.Dataset.counter()
+    else:
+        indices = tf.data.Dataset.range(num_samples)
+
+    return (
+        indices.map(load, num_parallel_calls=tf.data.AUTOTUNE)
+        .batch(batch_size)
+        .prefetch(tf.data.AUTOTUNE)
+    )
 
-    X_train, y_train = X[train_indices], y[train_indices]
-    X_val, y_val = X[val_indices], y[val_indices]
 
-    # Create model
-    print("Creating model...")
+def create_model(num_classes, jit_compile=False, alpha=1.0, image_size=IMAGE_SIZE):
+    """Create and compile the MobileNetV2 classifier with a frozen backbone"""
     base_model = MobileNetV2(
-        input_shape=(224, 224, 3), include_top=False, weights="imagenet"
+        input_shape=(image_size, image_size, 3),
+        alpha=alpha,
+        include_top=False,
+        weights="imagenet",
     )
     base_model.trainable = False
 
@@ -191,7 +454,8 @@ def create_and_train_model():
             tf.keras.layers.GlobalAveragePooling2D(),
             tf.keras.layers.Dense(128, activation="relu"),
             tf.keras.layers.Dropout(0.2),
-            tf.keras.layers.Dense(len(np.unique(y)), activation="softmax"),
+            # Softmax stays float32 under mixed precision for stable outputs
+            tf.keras.layers.Dense(num_classes, activation="softmax", dtype="float32"),
         ]
     )
 
@@ -200,39 +464,472 @@ def create_and_train_model():
         optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
         loss="sparse_categorical_crossentropy",
         metrics=["accuracy"],
+        jit_compile=jit_compile,
+    )
+
+    return model, base_model
+
+
+def resize_images(images, image_size):
+    """Resize an array of images to image_size x image_size, one at a time"""
+    resized = np.empty((len(images), image_size, image_size, 3), images.dtype)
+    for i, image in enumerate(images):
+        resized[i] = cv2.resize(image, (image_size, image_size))
+    return resized
+
+
+def resize_fit_data(fit_data, image_size):
+    """model.fit arguments with every image resized for a swept input size"""
+    if image_size == IMAGE_SIZE:
+        return fit_data
+
+    if "y" not in fit_data:
+
+        def resize(images, labels):
+            return tf.image.resize(images, (image_size, image_size)), labels
+
+        return {
+            **fit_data,
+            "x": fit_data["x"].map(resize),
+            "validation_data": fit_data["validation_data"].map(resize),
+        }
+
+    X_val, y_val = fit_data["validation_data"]
+    return {
+        **fit_data,
+        "x": resize_images(fit_data["x"], image_size),
+        "validation_data": (resize_images(X_val, image_size), y_val),
+    }
+
+
+def convert_model(model):
+    """Convert a trained Keras model to the float TFLite model the app loads"""
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    return converter.convert()
+
+
+def create_and_train_model(
+    num_samples_per_class=100,
+    num_workers=None,
+    seed=None,
+    batched=False,
+    streaming=False,
+    int8=False,
+    force=False,
+    feature_cache_dir=None,
+    mixed_precision=False,
+    jit_compile=False,
+    profile=False,
+    trace_steps=None,
+    sweep=None,
+    latency_budget_ms=DEFAULT_LATENCY_BUDGET_MS,
+    sparsity_levels=None,
+    num_clusters=None,
+):
+    """Create and train the model.
+
+    With streaming=True no dataset is materialized: training images are
+    generated on the fly for every epoch and peak memory no longer grows
+    with num_samples_per_class. With int8=True a full-integer model with
+    uint8 input/output is exported as well, calibrated on fresh synthetic
+    images. Returns None without training when the build manifest shows the
+    model was built from the same inputs, unless force=True. With
+    feature_cache_dir set, the frozen MobileNetV2 runs once per image and the
+    classification head is trained on the cached pooled embeddings.
+    mixed_precision trains in bfloat16 where the CPU supports it and
+    jit_compile compiles the train step with XLA. profile=True (or a
+    (start, stop) trace_steps window for tf.profiler) appends a per-phase
+    timing report to skin_disease_model_profile.json. With sweep, a list
+    of (alpha, image_size) pairs, a MobileNetV2 variant is trained for each
+    and the most accurate one whose TFLite CPU latency fits
+    latency_budget_ms is exported; its input size goes into the metadata.
+    With sparsity_levels, pruned copies of the exported model (clustered
+    to num_clusters values per kernel if set) are fine-tuned and written
+    next to it, and their size, load time and accuracy are compared in the
+    metadata (see compression.compress_model).
+    """
+    if streaming and feature_cache_dir:
+        raise ValueError("The feature cache needs a fixed dataset, not streaming")
+
+    num_classes = len(list_diseases())
+    policy = set_precision(mixed_precision)
+
+    # num_workers is left out: the parallel dataset does not depend on it
+    inputs_hash = hash_inputs(
+        {
+            "skin_diseases": SKIN_DISEASES,
+            "num_samples_per_class": num_samples_per_class,
+            "seed": seed,
+            "batched": batched,
+            "streaming": streaming,
+            "parallel": bool(num_workers),
+            "int8": int8,
+            "feature_cache": bool(feature_cache_dir),
+            "mixed_precision": mixed_precision,
+            "jit_compile": jit_compile,
+            "sweep": sweep,
+            "latency_budget_ms": latency_budget_ms if sweep else None,
+            "sparsity_levels": sparsity_levels,
+            "num_clusters": num_clusters if sparsity_levels else None,
+        },
+        files=source_files(__file__),
     )
+    if not force and is_up_to_date(MODEL_DIR, "skin_disease_model", inputs_hash):
+        print("skin_disease_model is up to date, skipping training")
+        return None
+
+    profiler = Profiler("skin_disease_model", trace_steps=trace_steps)
+
+    if streaming:
+        print("Streaming synthetic dataset...")
+        save_label_mapping()
+        if seed is None:
+            seed = np.random.randint(2**31)
+
+        num_samples = num_samples_per_class * num_classes
+        num_train = int(num_samples * 0.8)
+        fit_data = {
+            "x": create_synthetic_stream(seed, 0, 32),
+            "steps_per_epoch": -(-num_train // 32),
+            "validation_data": create_synthetic_stream(
+                seed, 1, 32, num_samples=num_samples - num_train
+            ),
+        }
+
+    else:
+        print("Generating synthetic dataset...")
+        with profiler.span("generate_data"):
+            if num_workers:
+                X, y = create_dataset_parallel(
+                    num_samples_per_class,
+                    num_workers=num_workers,
+                    seed=0 if seed is None else seed,
+                )
+            else:
+                X, y = create_dataset(
+                    num_samples_per_class=num_samples_per_class,
+                    batched=batched,
+                    seed=0 if seed is None else seed,
+                )
+
+        # Split into training and validation sets
+        indices = np.random.RandomState(0 if seed is None else seed).permutation(len(X))
+        split_idx = int(len(X) * 0.8)
+        train_indices = indices[:split_idx]
+        val_indices = indices[split_idx:]
+
+        X_train, y_train = X[train_indices], y[train_indices]
+        X_val, y_val = X[val_indices], y[val_indices]
+        if num_workers:
+            # The split copied the images out of the generator's memmap
+            del X
+            os.remove(PARALLEL_DATASET_PATH)
+        fit_data = {
+            "x": X_train,
+            "y": y_train,
+            "validation_data": (X_val, y_val),
+            "batch_size": 32,
+        }
+
+    def train(fit_data, alpha=1.0, image_size=IMAGE_SIZE, phase="fit"):
+        print("Creating model...")
+        model, base_model = create_model(
+            num_classes, jit_compile=jit_compile, alpha=alpha, image_size=image_size
+        )
 
-    # Train model
-    print("Training model...")
-    history = model.fit(
-        X_train,
-        y_train,
-        validation_data=(X_val, y_val),
-        epochs=10,
-        batch_size=32,
-        callbacks=[
+        print("Training model...")
+        fit_callbacks = profiler.callbacks(
+            phase, 32, f"{policy}, XLA" if jit_compile else policy
+        )
+        callbacks = [
             tf.keras.callbacks.EarlyStopping(
                 monitor="val_loss", patience=3, restore_best_weights=True
+            ),
+            *fit_callbacks,
+        ]
+        if feature_cache_dir:
+            # The backbone is frozen, so its pooled output never changes
+            extractor = create_feature_extractor(base_model)
+            X_val, y_val = fit_data["validation_data"]
+            with profiler.span(phase.replace("fit", "feature_cache", 1)):
+                train_features, train_labels = cached_embeddings(
+                    extractor,
+                    array_batches(fit_data["x"], fit_data["y"]),
+                    feature_cache_dir,
+                    f"{base_model.name}_imagenet_{image_size}",
+                )
+                val_features, val_labels = cached_embeddings(
+                    extractor,
+                    array_batches(X_val, y_val),
+                    feature_cache_dir,
+                    f"{base_model.name}_imagenet_{image_size}",
+                )
+            with profiler.span(phase):
+                history = fit_head(
+                    model,
+                    train_features,
+                    train_labels,
+                    val_features,
+                    val_labels,
+                    batch_size=32,
+                    epochs=10,
+                    callbacks=callbacks,
+                )
+        else:
+            with profiler.span(phase):
+                history = model.fit(**fit_data, epochs=10, callbacks=callbacks)
+
+        if policy != "float32":
+
+            def build_float32():
+                return create_model(num_classes, alpha=alpha, image_size=image_size)[0]
+
+            model = float32_copy(build_float32, model)
+        return model, history, fit_callbacks[0]
+
+    if sweep:
+        # Only the best variant so far is kept, not every trained model
+        rows = []
+        best = None
+        for alpha, image_size in sweep:
+            name = variant_name("skin_disease_model", alpha, image_size)
+            print(f"\nSweep: training {name}...")
+            model, history, step_timer = train(
+                resize_fit_data(fit_data, image_size),
+                alpha,
+                image_size,
+                phase=f"fit_{alpha}_{image_size}",
             )
-        ],
-    )
-
-    # Convert to TFLite
-    print("Converting model to TFLite...")
-    converter = tf.lite.TFLiteConverter.from_keras_model(model)
-    tflite_model = converter.convert()
+            tflite_model = convert_model(model)
+            # EarlyStopping restored the weights of the lowest val_loss epoch
+            best_epoch = int(np.argmin(history.history["val_loss"]))
+            row = {
+                "model": name,
+                "alpha": alpha,
+                "input_size": image_size,
+                "accuracy": float(history.history["val_accuracy"][best_epoch]),
+                "latency_ms": measure_latency(tflite_model),
+                "size_bytes": len(tflite_model),
+            }
+            rows.append(row)
+            if best is None or budget_key(row, latency_budget_ms) > budget_key(
+                best[0], latency_budget_ms
+            ):
+                best = (row, model, history, step_timer, tflite_model)
+        chosen, model, history, step_timer, tflite_model = best
+        print_sweep(rows, chosen, latency_budget_ms)
+        image_size = chosen["input_size"]
+    else:
+        model, history, step_timer = train(fit_data)
+        image_size = IMAGE_SIZE
+
+        # Convert to TFLite
+        print("Converting model to TFLite...")
+        with profiler.span("convert"):
+            tflite_model = convert_model(model)
 
     # Save model
-    with open(os.path.join(MODEL_DIR, "skin_disease_model.tflite"), "wb") as f:
-        f.write(tflite_model)
+    with profiler.span("write_model"):
+        with open(os.path.join(MODEL_DIR, "skin_disease_model.tflite"), "wb") as f:
+            f.write(tflite_model)
+
+    if int8:
+        diseases = list_diseases()
+        rng = np.random.RandomState(0 if seed is None else seed)
+        representative = (
+            cv2.resize(
+                generate_synthetic_image(disease, animal_type, rng=rng),
+                (image_size, image_size),
+            )
+            for animal_type, disease in (
+                diseases[i % len(diseases)] for i in range(NUM_REPRESENTATIVE_SAMPLES)
+            )
+        )
+        with profiler.span("int8_export"):
+            int8_info = save_int8_model(
+                model, representative, MODEL_DIR, "skin_disease_model", tflite_model
+            )
+
+    compressed_outputs = []
+    if sparsity_levels:
+        compression_info, compressed_outputs = compress_model(
+            model,
+            tflite_model,
+            fit_data,
+            convert_model,
+            MODEL_DIR,
+            "skin_disease_model",
+            sparsity_levels,
+            num_clusters,
+            callbacks=lambda phase: profiler.callbacks(
+                phase, 32, f"{policy}, XLA" if jit_compile else policy
+            ),
+            span=profiler.span,
+        )
+
+    metadata_path = os.path.join(MODEL_DIR, "skin_disease_metadata.json")
+    with open(metadata_path, "r") as f:
+        metadata = json.load(f)
+    metadata["input_shape"] = [image_size, image_size, 3]
+    metadata["preprocessing"] = {"resized_size": image_size}
+    if sweep:
+        metadata["sweep"] = sweep_metadata(rows, chosen, latency_budget_ms)
+    metadata["training"] = {
+        "precision": policy,
+        "jit_compile": jit_compile,
+        "step_time_ms": step_timer.epoch_step_times,
+        "images_per_sec": step_timer.epoch_samples_per_sec,
+    }
+    if int8:
+        metadata["int8"] = int8_info
+    if sparsity_levels:
+        metadata["compression"] = compression_info
+    with open(metadata_path, "w") as f:
+        json.dump(metadata, f, indent=2)
+    write_bundle(
+        os.path.join(MODEL_DIR, "skin_disease_model" + BUNDLE_EXTENSION),
+        label_list(metadata["label_mapping"]),
+        groups={
+            animal_type: [disease["name"] for disease in diseases]
+            for animal_type, diseases in SKIN_DISEASES.items()
+        },
+        input_shape=list(model.input_shape[1:]),
+        output_shape=[num_classes],
+        quantization=metadata.get("int8"),
+        attributes={"precision": policy, "resized_size": str(image_size)},
+    )
+
+    outputs = [
+        "skin_disease_model.tflite",
+        "skin_disease_metadata.json",
+        "skin_disease_model" + BUNDLE_EXTENSION,
+    ]
+    if int8:
+        outputs.append("skin_disease_model_int8.tflite")
+    outputs += compressed_outputs
+    record_build(MODEL_DIR, "skin_disease_model", inputs_hash, outputs)
+    if profile or trace_steps:
+        profiler.save(MODEL_DIR)
 
     return history
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the skin disease model")
+    parser.add_argument("--samples-per-class", type=int, default=100)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Generate the dataset with this many worker processes",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--batched",
+        action="store_true",
+        help="Rasterize disease patterns with the vectorized NumPy renderer",
+    )
+    parser.add_argument(
+        "--benchmark-patterns",
+        action="store_true",
+        help="Benchmark the batched pattern rasterizer against OpenCV and exit",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Generate fresh training images on the fly instead of a fixed dataset",
+    )
+    parser.add_argument(
+        "--int8",
+        action="store_true",
+        help="Also export a full-integer model with uint8 input/output",
+    )
+    parser.add_argument(
+        "--feature-cache-dir",
+        default=None,
+        help="Train the head on frozen-backbone embeddings cached here",
+    )
+    parser.add_argument(
+        "--mixed-precision",
+        action="store_true",
+        help="Train in bfloat16 on CPUs with AVX512-BF16/AMX support",
+    )
+    parser.add_argument(
+        "--jit-compile",
+        action="store_true",
+        help="Compile the train step with XLA",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Append a per-phase timing report to skin_disease_model_profile.json",
+    )
+    parser.add_argument(
+        "--trace-steps",
+        type=int,
+        nargs=2,
+        metavar=("START", "STOP"),
+        help="Capture a tf.profiler trace of these train steps",
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Train MobileNetV2 variants across input sizes and widths and keep "
+        "the most accurate one within --latency-budget-ms",
+    )
+    parser.add_argument(
+        "--latency-budget-ms",
+        type=float,
+        default=DEFAULT_LATENCY_BUDGET_MS,
+        help="Largest median single-image TFLite latency --sweep may pick",
+    )
+    parser.add_argument(
+        "--prune",
+        type=float,
+        nargs="+",
+        metavar="SPARSITY",
+        help="Also export pruned variants fine-tuned to these sparsities, "
+        "e.g. 0.5 0.75",
+    )
+    parser.add_argument(
+        "--clusters",
+        type=int,
+        default=None,
+        help="Cluster the pruned kernels to this many shared values each",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Retrain even if the build manifest says the model is up to date",
+    )
+    args = parser.parse_args()
+
+    if args.benchmark_patterns:
+        benchmark_pattern_rasterizer()
+        sys.exit(0)
+
     print("=== Starting Skin Disease Model Training with Synthetic Data ===")
     try:
-        history = create_and_train_model()
+        history = create_and_train_model(
+            num_samples_per_class=args.samples_per_class,
+            num_workers=args.workers,
+            seed=args.seed,
+            batched=args.batched,
+            streaming=args.streaming,
+            int8=args.int8,
+            force=args.force,
+            feature_cache_dir=args.feature_cache_dir,
+            mixed_precision=args.mixed_precision,
+            jit_compile=args.jit_compile,
+            profile=args.profile,
+            trace_steps=args.trace_steps,
+            sweep=sweep_candidates() if args.sweep else None,
+            latency_budget_ms=args.latency_budget_ms,
+            sparsity_levels=args.prune,
+            num_clusters=args.clusters,
+        )
+        if history is None:
+            sys.exit(0)
         print("\nTraining completed successfully!")
         print("\nModel performance metrics:")
         print(f"Final training accuracy: {history.history['accuracy'][-1]:.2f}")
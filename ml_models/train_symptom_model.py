@@ -1,15 +1,37 @@
 import tensorflow as tf
 import numpy as np
+import argparse
 import json
 import os
 from pathlib import Path
 import random
+from profiling import Profiler
+from build_manifest import hash_inputs, is_up_to_date, record_build, source_files
+from tflite_utils import NUM_REPRESENTATIVE_SAMPLES, measure_latency, save_int8_model
+from model_bundle import BUNDLE_EXTENSION, label_list, write_bundle
+from symptom_mlp import weights_filename
+from symptom_metadata import (
+    ANIMAL_TYPES,
+    CORE_SYMPTOM_PROB,
+    NOISE_SYMPTOM_PROB,
+    build_symptom_index,
+    disease_label,
+)
 
 # Get absolute paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 MODEL_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "assets", "models")
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# Code whose changes invalidate previously built models
+SOURCE_FILES = source_files(__file__)
+
+# Hidden layers of the combined model; per-species models are sized to
+# their own inputs by species_hidden_units
+HIDDEN_UNITS = (256, 128, 64)
+# Dropout after each hidden layer but the last
+DROPOUT_RATES = (0.3, 0.2)
+
 
 def load_metadata():
     """Load the symptoms metadata file"""
@@ -26,33 +48,78 @@ def load_metadata():
         raise
 
 
-def generate_synthetic_data(metadata, samples_per_disease=1000):
+def label_mapping_filename(animal_types):
+    """Label mapping file of the combined or a per-species model"""
+    if len(animal_types) == 1:
+        return f"symptoms_{animal_types[0]}_label_mapping.json"
+    return "symptom_label_mapping.json"
+
+
+def model_outputs(model_name, animal_types, int8=False):
+    """Asset files written when building one symptom model"""
+    outputs = [
+        f"{model_name}.tflite",
+        f"{model_name}_info.json",
+        label_mapping_filename(animal_types),
+        model_name + BUNDLE_EXTENSION,
+        weights_filename(model_name),
+    ]
+    if int8:
+        outputs.append(f"{model_name}_int8.tflite")
+    return outputs
+
+
+def training_inputs_hash(metadata, animal_types, **hyperparameters):
+    """Hash the species' metadata, hyperparameters and trainer code"""
+    return hash_inputs(
+        {
+            "symptoms": {a: metadata["symptoms"][a] for a in animal_types},
+            "diseases": {a: metadata["diseases"][a] for a in animal_types},
+            "hyperparameters": hyperparameters,
+        },
+        files=SOURCE_FILES,
+    )
+
+
+def save_label_mapping(
+    label_mapping, all_symptoms, symptom_to_index, animal_types=ANIMAL_TYPES
+):
+    """Save label mapping and symptom information"""
+    metadata_to_save = {
+        "label_mapping": label_mapping,
+        "symptoms": all_symptoms,
+        "symptom_to_index": symptom_to_index,
+    }
+
+    with open(os.path.join(MODEL_DIR, label_mapping_filename(animal_types)), "w") as f:
+        json.dump(metadata_to_save, f, indent=2)
+
+
+def generate_synthetic_data(
+    metadata,
+    samples_per_disease=1000,
+    core_prob=CORE_SYMPTOM_PROB,
+    noise_prob=NOISE_SYMPTOM_PROB,
+    animal_types=ANIMAL_TYPES,
+):
     """Generate synthetic training data based on metadata"""
     all_data = []
     all_labels = []
     label_mapping = {}
     current_label = 0
 
-    # Create a combined set of all symptoms
-    all_symptoms = set()
-    for animal_type in ["dog", "cat"]:
-        all_symptoms.update(metadata["symptoms"][animal_type])
-    all_symptoms = sorted(
-        list(all_symptoms)
-    )  # Convert to sorted list for consistent ordering
-
-    print(f"\nTotal unique symptoms across all animals: {len(all_symptoms)}")
-
-    # Create symptom index mapping for quick lookup
-    symptom_to_index = {symptom: idx for idx, symptom in enumerate(all_symptoms)}
+    all_symptoms, symptom_to_index = build_symptom_index(metadata, animal_types)
+    print(f"\nTotal unique symptoms across {animal_types}: {len(all_symptoms)}")
 
-    for animal_type in ["dog", "cat"]:
+    for animal_type in animal_types:
         diseases = metadata["diseases"][animal_type]
         print(f"\nProcessing {animal_type} diseases...")
         print(f"Number of diseases: {len(diseases)}")
 
         for disease in diseases:
-            label_mapping[current_label] = f"{animal_type}_{disease['name']}"
+            label_mapping[current_label] = disease_label(
+                animal_type, disease, animal_types
+            )
             disease_symptoms = set(disease["symptoms"])
 
             print(f"Generating samples for {disease['name']}...")
@@ -63,12 +130,12 @@ def generate_synthetic_data(metadata, samples_per_disease=1000):
                 # Add core symptoms (70-100% chance)
                 for symptom in disease_symptoms:
                     if symptom in symptom_to_index:  # Check if symptom exists
-                        if random.random() < 0.7:
+                        if random.random() < core_prob:
                             symptom_vector[symptom_to_index[symptom]] = 1.0
 
                 # Add random non-core symptoms (5% chance)
                 for symptom in all_symptoms:
-                    if symptom not in disease_symptoms and random.random() < 0.05:
+                    if symptom not in disease_symptoms and random.random() < noise_prob:
                         symptom_vector[symptom_to_index[symptom]] = 1.0
 
                 all_data.append(symptom_vector)
@@ -84,31 +151,88 @@ def generate_synthetic_data(metadata, samples_per_disease=1000):
     X = np.array(all_data, dtype=np.float32)
     y = np.array(all_labels, dtype=np.int32)
 
-    # Save label mapping and symptom information
-    metadata_to_save = {
-        "label_mapping": label_mapping,
-        "symptoms": all_symptoms,
-        "symptom_to_index": symptom_to_index,
-    }
+    save_label_mapping(label_mapping, all_symptoms, symptom_to_index, animal_types)
 
-    with open(os.path.join(MODEL_DIR, "symptom_label_mapping.json"), "w") as f:
-        json.dump(metadata_to_save, f, indent=2)
+    return X, y
+
+
+def generate_synthetic_data_batched(
+    metadata,
+    samples_per_disease=1000,
+    core_prob=CORE_SYMPTOM_PROB,
+    noise_prob=NOISE_SYMPTOM_PROB,
+    seed=None,
+    animal_types=ANIMAL_TYPES,
+):
+    """Generate the same synthetic distribution as generate_synthetic_data,
+    drawing one Bernoulli mask per disease instead of one random() per symptom.
+
+    Samples are written straight into preallocated X/y buffers, so the cost
+    is a handful of NumPy calls per disease regardless of samples_per_disease.
+    """
+    rng = np.random.default_rng(seed)
+    all_symptoms, symptom_to_index = build_symptom_index(metadata, animal_types)
+    print(f"\nTotal unique symptoms across {animal_types}: {len(all_symptoms)}")
+
+    diseases = [
+        (animal_type, disease)
+        for animal_type in animal_types
+        for disease in metadata["diseases"][animal_type]
+    ]
+    num_features = len(all_symptoms)
+
+    X = np.empty((len(diseases) * samples_per_disease, num_features), dtype=np.float32)
+    y = np.empty(len(diseases) * samples_per_disease, dtype=np.int32)
+    label_mapping = {}
+
+    for label, (animal_type, disease) in enumerate(diseases):
+        label_mapping[label] = disease_label(animal_type, disease, animal_types)
+
+        # Per-symptom presence probability: core symptoms vs. background noise
+        probs = np.full(num_features, noise_prob, dtype=np.float32)
+        core_indices = [
+            symptom_to_index[symptom]
+            for symptom in disease["symptoms"]
+            if symptom in symptom_to_index
+        ]
+        probs[core_indices] = core_prob
+
+        start = label * samples_per_disease
+        end = start + samples_per_disease
+        X[start:end] = (
+            rng.random((samples_per_disease, num_features), dtype=np.float32) < probs
+        )
+        y[start:end] = label
+
+    print(f"\nTotal number of samples: {len(X)}")
+    print(f"Total number of diseases: {len(diseases)}")
+    print(f"Feature vector size: {num_features}")
+
+    save_label_mapping(label_mapping, all_symptoms, symptom_to_index, animal_types)
 
     return X, y
 
 
-def create_model(input_dim, num_classes):
+def species_hidden_units(input_dim, num_classes):
+    """Two hidden layers sized to one species' symptoms and diseases.
+
+    The first is the power of two at or above twice the inputs, the second
+    half of it but never narrower than the output; 12 dog symptoms give
+    the 32-16 stack of the shipped per-species models.
+    """
+    first = 1 << (2 * input_dim - 1).bit_length()
+    return (first, max(first // 2, num_classes))
+
+
+def create_model(input_dim, num_classes, hidden_units=HIDDEN_UNITS):
     """Create and compile the model"""
-    model = tf.keras.Sequential(
-        [
-            tf.keras.layers.Dense(256, activation="relu", input_shape=(input_dim,)),
-            tf.keras.layers.Dropout(0.3),
-            tf.keras.layers.Dense(128, activation="relu"),
-            tf.keras.layers.Dropout(0.2),
-            tf.keras.layers.Dense(64, activation="relu"),
-            tf.keras.layers.Dense(num_classes, activation="softmax"),
-        ]
-    )
+    layers = [tf.keras.Input(shape=(input_dim,))]
+    for i, units in enumerate(hidden_units):
+        layers.append(tf.keras.layers.Dense(units, activation="relu"))
+        if i < len(hidden_units) - 1:
+            layers.append(tf.keras.layers.Dropout(DROPOUT_RATES[i]))
+    layers.append(tf.keras.layers.Dense(num_classes, activation="softmax"))
+    model = tf.keras.Sequential(layers)
 
     model.compile(
         optimizer=tf.keras.optimizers.Adam(learning_rate=0.001),
@@ -119,18 +243,88 @@ def create_model(input_dim, num_classes):
     return model
 
 
-def train_model():
-    """Train the model with synthetic data"""
-    print("Loading metadata...")
-    metadata = load_metadata()
+def generate_data(
+    metadata, samples_per_disease, noise_prob, batched, seed, animal_types
+):
+    """Generate synthetic data with the loop or the vectorized generator"""
+    if batched:
+        return generate_synthetic_data_batched(
+            metadata,
+            samples_per_disease,
+            noise_prob=noise_prob,
+            seed=seed,
+            animal_types=animal_types,
+        )
+    return generate_synthetic_data(
+        metadata,
+        samples_per_disease,
+        noise_prob=noise_prob,
+        animal_types=animal_types,
+    )
 
-    print("Generating synthetic training data...")
-    X, y = generate_synthetic_data(metadata)
 
+def load_label_mapping(animal_types):
+    """Read back the label mapping saved with the training data"""
+    with open(os.path.join(MODEL_DIR, label_mapping_filename(animal_types)), "r") as f:
+        return json.load(f)
+
+
+def save_bundle(model_name, animal_types, shape_info):
+    """Write <model_name>.bundle from the saved label mapping and shape info"""
+    mapping = load_label_mapping(animal_types)
+    write_bundle(
+        os.path.join(MODEL_DIR, model_name + BUNDLE_EXTENSION),
+        label_list(mapping["label_mapping"]),
+        inputs=mapping["symptoms"],
+        input_shape=shape_info["input_shape"],
+        output_shape=shape_info["output_shape"],
+        quantization=shape_info.get("int8"),
+    )
+
+
+def save_npz_weights(model, model_name, animal_types):
+    """Write the Dense weights and vocabulary for symptom_mlp to one .npz"""
+    mapping = load_label_mapping(animal_types)
+    dense_layers = [
+        layer for layer in model.layers if isinstance(layer, tf.keras.layers.Dense)
+    ]
+    arrays = {
+        "activations": np.array(
+            [layer.get_config()["activation"] for layer in dense_layers]
+        ),
+        "labels": np.array(label_list(mapping["label_mapping"])),
+        "symptoms": np.array(mapping["symptoms"]),
+    }
+    for i, layer in enumerate(dense_layers):
+        kernel, bias = layer.get_weights()
+        arrays[f"kernel_{i}"] = kernel.astype(np.float32)
+        arrays[f"bias_{i}"] = bias.astype(np.float32)
+    np.savez(os.path.join(MODEL_DIR, weights_filename(model_name)), **arrays)
+
+
+def fit_and_export(
+    X,
+    y,
+    model_name,
+    seed=None,
+    int8=False,
+    profiler=None,
+    animal_types=ANIMAL_TYPES,
+    hidden_units=HIDDEN_UNITS,
+):
+    """Train a model on X/y and export <model_name>.tflite with its info file,
+    bundle and NumPy weights.
+
+    The model has one relu Dense layer per entry of hidden_units. With
+    int8=True a full-integer model with uint8 input/output is exported
+    as well, calibrated on generated training samples. Training, conversion
+    and writes are timed as spans of profiler.
+    """
+    profiler = profiler or Profiler(model_name)
     print(f"Generated {len(X)} training samples for {len(np.unique(y))} diseases")
 
     # Split the data manually
-    indices = np.random.permutation(len(X))
+    indices = np.random.default_rng(seed).permutation(len(X))
     split_idx = int(len(X) * 0.8)
     train_indices = indices[:split_idx]
     val_indices = indices[split_idx:]
@@ -140,20 +334,22 @@ def train_model():
 
     # Create and train model
     print("Training model...")
-    model = create_model(X.shape[1], len(np.unique(y)))
-
-    history = model.fit(
-        X_train,
-        y_train,
-        validation_data=(X_val, y_val),
-        epochs=50,
-        batch_size=32,
-        callbacks=[
-            tf.keras.callbacks.EarlyStopping(
-                monitor="val_loss", patience=5, restore_best_weights=True
-            )
-        ],
-    )
+    model = create_model(X.shape[1], len(np.unique(y)), hidden_units)
+
+    with profiler.span("fit"):
+        history = model.fit(
+            X_train,
+            y_train,
+            validation_data=(X_val, y_val),
+            epochs=50,
+            batch_size=32,
+            callbacks=[
+                tf.keras.callbacks.EarlyStopping(
+                    monitor="val_loss", patience=5, restore_best_weights=True
+                ),
+                *profiler.callbacks("fit", 32, unit="samples"),
+            ],
+        )
 
     # Convert to TFLite
     print("Converting to TFLite format...")
@@ -171,12 +367,14 @@ def train_model():
     print(f"Output shape: {output_shape}")
 
     # Convert and save metadata
-    tflite_model = converter.convert()
+    with profiler.span("convert"):
+        tflite_model = converter.convert()
 
     # Save the model
-    model_path = os.path.join(MODEL_DIR, "symptom_model.tflite")
-    with open(model_path, "wb") as f:
-        f.write(tflite_model)
+    model_path = os.path.join(MODEL_DIR, f"{model_name}.tflite")
+    with profiler.span("write_model"):
+        with open(model_path, "wb") as f:
+            f.write(tflite_model)
 
     # Save input/output shape information
     shape_info = {
@@ -186,15 +384,244 @@ def train_model():
         "output_type": "float32",
     }
 
-    with open(os.path.join(MODEL_DIR, "symptom_model_info.json"), "w") as f:
-        json.dump(shape_info, f, indent=2)
+    if int8:
+        representative = X_train[
+            np.random.default_rng(seed).choice(
+                len(X_train), NUM_REPRESENTATIVE_SAMPLES, replace=False
+            )
+        ]
+        with profiler.span("int8_export"):
+            shape_info["int8"] = save_int8_model(
+                model, representative, MODEL_DIR, model_name, tflite_model
+            )
+
+    with profiler.span("write_info"):
+        with open(os.path.join(MODEL_DIR, f"{model_name}_info.json"), "w") as f:
+            json.dump(shape_info, f, indent=2)
+        save_bundle(model_name, animal_types, shape_info)
+        save_npz_weights(model, model_name, animal_types)
 
     print(f"Model saved to {model_path}")
     print(f"Model info saved with shapes: input{input_shape}, output{output_shape}")
+    return history, tflite_model
+
+
+def train_model(
+    samples_per_disease=1000,
+    noise_prob=NOISE_SYMPTOM_PROB,
+    batched=False,
+    seed=None,
+    int8=False,
+    force=False,
+    profile=False,
+    trace_steps=None,
+):
+    """Train the combined dog + cat model with synthetic data.
+
+    Training is skipped, returning None, when the build manifest shows the
+    model was already built from the same inputs, unless force=True. With
+    profile=True (or a (start, stop) trace_steps window for tf.profiler) a
+    timing report is appended to symptom_model_profile.json.
+    """
+    print("Loading metadata...")
+    metadata = load_metadata()
+
+    inputs_hash = training_inputs_hash(
+        metadata,
+        ANIMAL_TYPES,
+        samples_per_disease=samples_per_disease,
+        noise_prob=noise_prob,
+        batched=batched,
+        seed=seed,
+        int8=int8,
+    )
+    if not force and is_up_to_date(MODEL_DIR, "symptom_model", inputs_hash):
+        print("symptom_model is up to date, skipping training")
+        return None
+
+    profiler = Profiler("symptom_model", trace_steps=trace_steps)
+    print("Generating synthetic training data...")
+    with profiler.span("generate_data"):
+        X, y = generate_data(
+            metadata, samples_per_disease, noise_prob, batched, seed, ANIMAL_TYPES
+        )
+
+    history, _ = fit_and_export(
+        X, y, "symptom_model", seed=seed, int8=int8, profiler=profiler
+    )
+    record_build(
+        MODEL_DIR,
+        "symptom_model",
+        inputs_hash,
+        model_outputs("symptom_model", ANIMAL_TYPES, int8),
+    )
+    if profile or trace_steps:
+        profiler.save(MODEL_DIR)
     return history
 
 
+def train_per_species_models(
+    samples_per_disease=1000,
+    noise_prob=NOISE_SYMPTOM_PROB,
+    batched=False,
+    seed=None,
+    int8=False,
+    force=False,
+    profile=False,
+    trace_steps=None,
+):
+    """Train symptoms_<animal>_model.tflite over each species' own symptoms.
+
+    Each model only sees its species' symptom list and diseases, with
+    hidden layers sized to them by species_hidden_units, and is compared
+    against the combined symptom_model.tflite if one exists. A species
+    whose inputs are unchanged since its last build is not retrained.
+    """
+    print("Loading metadata...")
+    metadata = load_metadata()
+
+    combined_path = os.path.join(MODEL_DIR, "symptom_model.tflite")
+    combined = None
+    if os.path.exists(combined_path):
+        with open(combined_path, "rb") as f:
+            combined = f.read()
+
+    report = {}
+    for animal_type in ANIMAL_TYPES:
+        model_name = f"symptoms_{animal_type}_model"
+        inputs_hash = training_inputs_hash(
+            metadata,
+            [animal_type],
+            samples_per_disease=samples_per_disease,
+            noise_prob=noise_prob,
+            batched=batched,
+            seed=seed,
+            int8=int8,
+        )
+
+        if not force and is_up_to_date(MODEL_DIR, model_name, inputs_hash):
+            print(f"\n{model_name} is up to date, skipping training")
+            history = None
+            with open(os.path.join(MODEL_DIR, f"{model_name}.tflite"), "rb") as f:
+                tflite_model = f.read()
+        else:
+            print(f"\n=== Training {animal_type} symptom model ===")
+            profiler = Profiler(model_name, trace_steps=trace_steps)
+            with profiler.span("generate_data"):
+                X, y = generate_data(
+                    metadata,
+                    samples_per_disease,
+                    noise_prob,
+                    batched,
+                    seed,
+                    [animal_type],
+                )
+            history, tflite_model = fit_and_export(
+                X,
+                y,
+                model_name,
+                seed=seed,
+                int8=int8,
+                profiler=profiler,
+                animal_types=[animal_type],
+                hidden_units=species_hidden_units(X.shape[1], len(np.unique(y))),
+            )
+            record_build(
+                MODEL_DIR,
+                model_name,
+                inputs_hash,
+                model_outputs(model_name, [animal_type], int8),
+            )
+            if profile or trace_steps:
+                profiler.save(MODEL_DIR)
+
+        report[animal_type] = {
+            "history": history,
+            "input_size": len(metadata["symptoms"][animal_type]),
+            "num_classes": len(metadata["diseases"][animal_type]),
+            "size_bytes": len(tflite_model),
+            "latency_ms": measure_latency(tflite_model),
+        }
+
+    print(
+        f"\n{'model':<10}{'inputs':>8}{'classes':>9}{'size (KB)':>11}{'latency (ms)':>14}"
+    )
+    if combined is not None:
+        interpreter = tf.lite.Interpreter(model_content=combined)
+        input_size = interpreter.get_input_details()[0]["shape"][-1]
+        num_classes = interpreter.get_output_details()[0]["shape"][-1]
+        combined_ms = measure_latency(combined)
+        print(
+            f"{'combined':<10}{input_size:>8}{num_classes:>9}"
+            f"{len(combined) / 1024:>11.1f}{combined_ms:>14.4f}"
+        )
+    for animal_type, result in report.items():
+        print(
+            f"{animal_type:<10}{result['input_size']:>8}{result['num_classes']:>9}"
+            f"{result['size_bytes'] / 1024:>11.1f}{result['latency_ms']:>14.4f}"
+        )
+    if combined is not None:
+        for animal_type, result in report.items():
+            print(
+                f"{animal_type} model is "
+                f"{len(combined) / result['size_bytes']:.1f}x smaller and "
+                f"{combined_ms / result['latency_ms']:.1f}x faster than combined"
+            )
+    else:
+        print(f"No combined model at {combined_path} to compare against")
+
+    return report
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the symptom model")
+    parser.add_argument("--samples-per-disease", type=int, default=1000)
+    parser.add_argument("--noise-prob", type=float, default=NOISE_SYMPTOM_PROB)
+    parser.add_argument(
+        "--batched",
+        action="store_true",
+        help="Generate samples with the vectorized NumPy generator",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--int8",
+        action="store_true",
+        help="Also export a full-integer model with uint8 input/output",
+    )
+    parser.add_argument(
+        "--per-species",
+        action="store_true",
+        help="Train symptoms_dog_model / symptoms_cat_model instead of the combined model",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Append a per-phase timing report to <model>_profile.json",
+    )
+    parser.add_argument(
+        "--trace-steps",
+        type=int,
+        nargs=2,
+        metavar=("START", "STOP"),
+        help="Capture a tf.profiler trace of these train steps",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Retrain even if the build manifest says the model is up to date",
+    )
+    args = parser.parse_args()
+
     print("=== Starting Symptom Model Training with Synthetic Data ===")
-    history = train_model()
+    train = train_per_species_models if args.per_species else train_model
+    train(
+        samples_per_disease=args.samples_per_disease,
+        noise_prob=args.noise_prob,
+        batched=args.batched,
+        seed=args.seed,
+        int8=args.int8,
+        force=args.force,
+        profile=args.profile,
+        trace_steps=args.trace_steps,
+    )
     print("Training completed successfully!")
@@ -0,0 +1,92 @@
+import tensorflow as tf
+import numpy as np
+import platform
+import time
+
+
+def cpu_supports_bf16():
+    """Whether this CPU has native bfloat16 instructions (AVX512-BF16 or AMX)"""
+    if platform.system() != "Linux":
+        return False
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+def set_precision(mixed_precision=False):
+    """Set the global Keras dtype policy and return its name.
+
+    mixed_bfloat16 is only used where the CPU computes bfloat16 natively;
+    elsewhere it is emulated and slower than float32, so we stay on float32.
+    """
+    policy = "float32"
+    if mixed_precision:
+        if tf.config.list_physical_devices("GPU") or cpu_supports_bf16():
+            policy = "mixed_bfloat16"
+        else:
+            print("CPU has no AVX512-BF16/AMX support, training in float32")
+    tf.keras.mixed_precision.set_global_policy(policy)
+    return policy
+
+
+def float32_copy(build_model, model):
+    """Rebuild a mixed-precision model in float32 with the trained weights.
+
+    TFLite export and the app expect float32 compute, so models trained
+    under mixed_bfloat16 are converted from this copy.
+    """
+    policy = tf.keras.mixed_precision.global_policy()
+    tf.keras.mixed_precision.set_global_policy("float32")
+    try:
+        copy = build_model()
+        copy.set_weights(model.get_weights())
+    finally:
+        tf.keras.mixed_precision.set_global_policy(policy)
+    return copy
+
+
+class StepTimer(tf.keras.callbacks.Callback):
+    """Log the median train step time (and samples/sec) of every epoch"""
+
+    def __init__(self, batch_size=None, label="", unit="images"):
+        super().__init__()
+        self.batch_size = batch_size
+        self.label = label
+        self.unit = unit
+        self.epoch_step_times = []
+        self.epoch_samples_per_sec = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.step_times = []
+        self.step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        now = time.perf_counter()
+        self.step_times.append(now - self.step_start)
+        self.step_start = now
+
+    def on_epoch_end(self, epoch, logs=None):
+        # The median leaves out the first step's tracing / XLA compilation
+        step_ms = float(np.median(self.step_times)) * 1000 if self.step_times else 0
+        self.epoch_step_times.append(step_ms)
+        message = f"Epoch {epoch + 1}: {step_ms:.1f} ms/step"
+        if self.batch_size:
+            # Train steps only, like ms/step; validation and callbacks excluded
+            train_time = sum(self.step_times)
+            samples_per_sec = (
+                len(self.step_times) * self.batch_size / train_time
+                if train_time
+                else 0.0
+            )
+            self.epoch_samples_per_sec.append(samples_per_sec)
+            message += f", {samples_per_sec:.1f} {self.unit}/sec"
+            if logs is not None:
+                logs[f"{self.unit}_per_sec"] = samples_per_sec
+        if self.label:
+            message += f" [{self.label}]"
+        print(message)
+        if logs is not None:
+            logs["step_time_ms"] = step_ms